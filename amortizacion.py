@@ -0,0 +1,107 @@
+"""
+Cálculo de cuotas y cuadros de amortización (sistema francés) con NumPy.
+
+Las funciones aceptan escalares o arrays de (monto, cuotas, tasa_anual), de
+modo que un préstamo y un millón de escenarios usan el mismo código. Los
+resultados coinciden exactamente, redondeo incluido, con el cálculo cuota a
+cuota que se usaba antes en app.py.
+"""
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_CUADRO = ["Cuota N°", "Cuota total ($)", "Interés ($)", "Amortización ($)", "Saldo restante ($)"]
+
+# (1 + tasa) ** cuotas con el pow() de la libm, igual que el operador ** de Python.
+# np.power puede usar implementaciones SIMD que difieren en el último bit y
+# eso alcanza para cambiar el redondeo a centavos de algún valor.
+_pow = np.frompyfunc(math.pow, 2, 1)
+
+
+class Cronograma(NamedTuple):
+    # Arrays de forma (préstamos, cuotas máximas); las celdas posteriores a
+    # la última cuota de cada préstamo valen NaN
+    cuota_total: np.ndarray
+    interes: np.ndarray
+    amortizacion: np.ndarray
+    saldo: np.ndarray
+    cuotas: np.ndarray
+
+
+def _potencia(base, exponente):
+    return np.asarray(_pow(base, np.asarray(exponente, dtype=float)), dtype=float)
+
+
+def redondear(valores, decimales=2):
+    """np.round con el mismo resultado que round() de Python también en los casos límite."""
+    valores = np.asarray(valores, dtype=float)
+    redondeados = np.round(valores, decimales)
+    # np.round escala, redondea y vuelve a escalar; cerca de la mitad exacta
+    # puede diferir del redondeo correcto de Python
+    escalados = valores * 10.0 ** decimales
+    dudosos = np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6
+    if dudosos.any():
+        # tolist(): floats de Python; round() sobre np.float64 volvería a usar np.round
+        redondeados[dudosos] = [round(v, decimales) for v in valores[dudosos].tolist()]
+    return redondeados
+
+
+def calcular_cuota(monto, cuotas, tasa_anual):
+    """Cuota fija mensual; escalar si los argumentos son escalares, array si no."""
+    monto = np.asarray(monto, dtype=float)
+    cuotas = np.asarray(cuotas)
+    tasa_mensual = (np.asarray(tasa_anual, dtype=float) / 100) / 12
+    factor = _potencia(1 + tasa_mensual, cuotas)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cuota = np.where(
+            tasa_mensual == 0,
+            monto / cuotas,
+            monto * (tasa_mensual * factor) / (factor - 1),
+        )
+    return cuota.item() if cuota.ndim == 0 else cuota
+
+
+def calcular_cronogramas(montos, cuotas, tasas_anuales):
+    """Cronogramas redondeados a centavos de todos los préstamos a la vez."""
+    montos, cuotas, tasas_anuales = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(montos, dtype=float)),
+        np.atleast_1d(np.asarray(cuotas, dtype=np.int64)),
+        np.atleast_1d(np.asarray(tasas_anuales, dtype=float)),
+    )
+    tasa_mensual = (tasas_anuales / 100) / 12
+    cuota_total = np.asarray(calcular_cuota(montos, cuotas, tasas_anuales), dtype=float)
+
+    n_max = int(cuotas.max()) if cuotas.size else 0
+    forma = (montos.size, n_max)
+    interes = np.empty(forma)
+    amortizacion = np.empty(forma)
+    saldos = np.empty(forma)
+
+    # Como máximo 18 pasos, cada uno sobre todos los préstamos; las mismas
+    # operaciones que el cálculo cuota a cuota, para obtener los mismos valores
+    saldo = montos.copy()
+    for k in range(n_max):
+        interes[:, k] = saldo * tasa_mensual
+        amortizacion[:, k] = cuota_total - interes[:, k]
+        saldo = saldo - amortizacion[:, k]
+        saldos[:, k] = saldo
+
+    fuera_de_plazo = np.arange(1, n_max + 1) > cuotas[:, None]
+    resultado = []
+    for valores in (np.broadcast_to(cuota_total[:, None], forma), interes, amortizacion, np.maximum(saldos, 0)):
+        valores = redondear(valores)
+        valores[fuera_de_plazo] = np.nan
+        resultado.append(valores)
+    return Cronograma(*resultado, cuotas)
+
+
+def generar_cuadro_amortizacion(monto, cuotas, tasa_anual):
+    cronograma = calcular_cronogramas(monto, cuotas, tasa_anual)
+    columnas = [np.arange(1, int(cuotas) + 1)] + [
+        valores[0] for valores in (cronograma.cuota_total, cronograma.interes,
+                                   cronograma.amortizacion, cronograma.saldo)
+    ]
+    return pd.DataFrame(dict(zip(COLUMNAS_CUADRO, columnas)))
@@ -0,0 +1,209 @@
+"""
+Servicio HTTP (JSON) con la lógica del simulador, para usarlo desde otros
+sistemas sin una sesión de Streamlit.
+
+Endpoints:
+- POST /recibo?modo=layout: el PDF del recibo como cuerpo de la solicitud;
+  devuelve bruto, deducciones, neto, conceptos detectados y nombre.
+- POST /simulacion: {"monto", "cuotas", "tasa", "bruto"?, "neto"?}; valida
+  el préstamo con las reglas de resources.py y devuelve la cuota, el cuadro
+  de amortización y las reglas que no se aplicaron por faltar el sueldo
+  bruto o neto ("reglas_no_aplicadas").
+- POST /nota: las mismas columnas que una fila de lote_notas.py ("bruto"
+  opcional); devuelve el .docx de la nota y, en el encabezado
+  X-Reglas-No-Aplicadas (lista JSON), las reglas que no se aplicaron. Cada
+  nota generada se registra en la auditoría (auditoria.py), como en la app.
+- GET /salud
+
+La lectura de recibos y la generación de notas se ejecutan en un pool de
+procesos, de modo que el bucle de eventos sigue atendiendo otras solicitudes
+mientras tanto. Los errores de validación (monto no positivo, tasa negativa,
+cuotas no enteras, valores no finitos, reglas incumplidas) responden 422 con
+{"error": ...}.
+
+Uso:
+    python api.py --puerto 8000 --procesos 4
+    python api.py --puerto 8000 --auditoria /datos/auditoria.db
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import tornado.web
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+
+from amortizacion import generar_cuadro_amortizacion
+from auditoria import RUTA_AUDITORIA, Auditoria
+from elegibilidad import reglas_no_aplicadas, validar_prestamo
+from lote_notas import leer_opcional, leer_prestamo, preparar_solicitud
+from lote_recibos import procesos_disponibles
+from notas import MIME_DOCX, ErrorNota, generar_nota
+from recibos import MODO_EXTRACCION, MODOS_EXTRACCION, parsear_recibo_cacheado
+
+PUERTO = 8000
+
+
+def generar_nota_bytes(argumentos, directorio=None):
+    # Se ejecuta en el pool: devuelve bytes, que (a diferencia de BytesIO) se pueden enviar entre procesos
+    return generar_nota(**argumentos, directorio=directorio).getvalue()
+
+
+def simular(datos):
+    """Cuota, cuadro de amortización y reglas no aplicadas de un préstamo; ValueError si no es válido."""
+    monto, cuotas, tasa = leer_prestamo(datos)
+    sueldos = {campo: leer_opcional(datos, campo) for campo in ("bruto", "neto")}
+    cuota = validar_prestamo(monto, cuotas, tasa, **sueldos)
+    cuadro = generar_cuadro_amortizacion(monto, cuotas, tasa)
+    # Sin el sueldo bruto o neto, validar_prestamo omite las reglas que dependen de él
+    return {"cuota": cuota, "cuadro": cuadro.to_dict(orient="records"),
+            "reglas_no_aplicadas": reglas_no_aplicadas(**sueldos)}
+
+
+class ManejadorJSON(tornado.web.RequestHandler):
+    def initialize(self, pool, directorio, auditoria):
+        self.pool = pool
+        self.directorio = directorio
+        self.auditoria = auditoria
+
+    def leer_json(self):
+        try:
+            datos = json.loads(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="El cuerpo no es JSON válido")
+        if not isinstance(datos, dict):
+            raise tornado.web.HTTPError(400, reason="Se esperaba un objeto JSON")
+        return datos
+
+    async def en_pool(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, funcion, *args)
+
+    def responder_error(self, estado, mensaje):
+        self.set_status(estado)
+        self.finish({"error": mensaje})
+
+    def write_error(self, status_code, **kwargs):
+        self.finish({"error": self._reason})
+
+
+class ManejadorNoEncontrado(ManejadorJSON):
+    def prepare(self):
+        raise tornado.web.HTTPError(404, reason="Ruta desconocida")
+
+
+class ManejadorSalud(ManejadorJSON):
+    def get(self):
+        self.write({"estado": "ok"})
+
+
+class ManejadorRecibo(ManejadorJSON):
+    async def post(self):
+        modo = self.get_query_argument("modo", MODO_EXTRACCION)
+        if modo not in MODOS_EXTRACCION:
+            return self.responder_error(400, f"Modo de extracción desconocido: {modo}")
+        if not self.request.body:
+            return self.responder_error(400, "Falta el PDF en el cuerpo de la solicitud")
+        recibo = await self.en_pool(parsear_recibo_cacheado, self.request.body, modo)
+        if recibo.error:
+            return self.responder_error(422, recibo.error)
+        self.write(recibo._asdict())
+
+
+class ManejadorSimulacion(ManejadorJSON):
+    def post(self):
+        # Menos de un milisegundo: no hace falta pasar por el pool
+        datos = self.leer_json()
+        try:
+            self.write(simular(datos))
+        except KeyError as e:
+            self.responder_error(422, f"Falta el campo {e}")
+        except (TypeError, ValueError) as e:
+            self.responder_error(422, str(e))
+
+
+class ManejadorNota(ManejadorJSON):
+    async def post(self):
+        datos = self.leer_json()
+        try:
+            argumentos = preparar_solicitud(datos)
+        except KeyError as e:
+            return self.responder_error(422, f"Falta el campo {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            return self.responder_error(422, f"Solicitud inválida: {e}")
+        try:
+            contenido = await self.en_pool(generar_nota_bytes, argumentos, self.directorio)
+        except ErrorNota as e:
+            return self.responder_error(500, str(e))
+        bruto = leer_opcional(datos, "bruto")
+        if self.auditoria is not None:
+            self.auditoria.registrar(
+                "nota", argumentos["nombre"], origen="api", area=argumentos["area"], sector=argumentos["sector"],
+                motivo=argumentos["motivo"], puesto=argumentos["puesto"], monto=argumentos["monto"],
+                cuotas=argumentos["cuotas"], tasa_anual=argumentos["tasa_final"], cuota=argumentos["cuota"],
+                fecha=argumentos["fecha"], bruto=bruto, neto=argumentos["neto"],
+                sha256=hashlib.sha256(contenido).hexdigest(), bytes=len(contenido)
+            )
+        self.set_header("Content-Type", MIME_DOCX)
+        no_aplicadas = reglas_no_aplicadas(bruto, argumentos["neto"])
+        # json.dumps escapa las etiquetas a ASCII: un encabezado HTTP no admite "≤"
+        self.set_header("X-Reglas-No-Aplicadas", json.dumps(no_aplicadas))
+        self.set_header("Content-Disposition", 'attachment; filename="nota.docx"')
+        self.finish(contenido)
+
+
+def crear_app(pool, directorio=None, auditoria=None):
+    opciones = {"pool": pool, "directorio": os.path.abspath(directorio or os.getcwd()), "auditoria": auditoria}
+    return tornado.web.Application([
+        (r"/salud", ManejadorSalud, opciones),
+        (r"/recibo", ManejadorRecibo, opciones),
+        (r"/simulacion", ManejadorSimulacion, opciones),
+        (r"/nota", ManejadorNota, opciones),
+    ], default_handler_class=ManejadorNoEncontrado, default_handler_args=opciones)
+
+
+@contextlib.asynccontextmanager
+async def servidor_local(procesos=None, directorio=None, auditoria=None):
+    """Levanta el servicio en un puerto libre de 127.0.0.1 dentro del proceso actual y devuelve su URL.
+
+    Solo registra las notas si se pasa `auditoria`.
+    """
+    with ProcessPoolExecutor(max_workers=procesos or procesos_disponibles()) as pool:
+        sockets = bind_sockets(0, "127.0.0.1")
+        puerto = sockets[0].getsockname()[1]
+        servidor = HTTPServer(crear_app(pool, directorio, auditoria))
+        servidor.add_sockets(sockets)
+        try:
+            yield f"http://127.0.0.1:{puerto}"
+        finally:
+            servidor.stop()
+            await servidor.close_all_connections()
+
+
+async def servir(puerto, procesos=None, directorio=None, ruta_auditoria=RUTA_AUDITORIA):
+    with ProcessPoolExecutor(max_workers=procesos or procesos_disponibles()) as pool:
+        crear_app(pool, directorio, Auditoria(ruta_auditoria)).listen(puerto)
+        print(f"✅ Escuchando en http://0.0.0.0:{puerto}")
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP del simulador de adelantos.")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto HTTP")
+    parser.add_argument("-p", "--procesos", type=int, default=None,
+                        help="Procesos para leer recibos y generar notas (por defecto, uno por núcleo)")
+    parser.add_argument("--plantillas", default=None,
+                        help="Carpeta donde buscar la plantilla de la nota (por defecto, la actual)")
+    parser.add_argument("--auditoria", default=RUTA_AUDITORIA,
+                        help="Archivo SQLite de auditoría donde se registra cada nota (por defecto, "
+                             "SIMULADOR_AUDITORIA o auditoria.db)")
+    args = parser.parse_args(argv)
+    asyncio.run(servir(args.puerto, args.procesos, args.plantillas, args.auditoria))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,82 @@
 import streamlit as st
-import fitz  # pymupdf
-import re
-import pandas as pd
-from docx import Document
-from num2words import num2words
-from datetime import datetime, timedelta
-import calendar
+import functools
+import hashlib
 import io
-import base64
-import os
-from resources import CODIGOS_BRUTO, CODIGOS_DEDUCCIONES, MOTIVOS, TOPE_MAXIMO_PRESTAMO
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from resources import MOTIVOS, CUOTAS_MAXIMAS, CRITERIO_BASE_SUELDO
+from recibos import parsear_recibos
+from notas import MIME_DOCX, ErrorNota, generar_nota
+from lote_notas import COLUMNAS_SOLICITUD, generar_lote, leer_solicitudes
+from lote_recibos import COLUMNAS, fila_recibo, procesos_disponibles
+from auditoria import Auditoria
+from metricas import ACTIVAS as METRICAS_ACTIVAS, contar_recarga, definir_contexto, etapa
+
+# amortizacion, elegibilidad y cartera (NumPy, pandas) se importan en las secciones que
+# los usan; recibos y notas importan pymupdf y python-docx recién al usarlos.
+# Así la primera carga de la página no paga por ninguno de ellos.
+
+# Los cálculos se repiten en cada recarga del script; se guardan según sus
+# argumentos, con una cantidad máxima de entradas y un tiempo de vigencia
+MAX_ENTRADAS_CACHE = 128
+TTL_CACHE = 60 * 60  # segundos
+cache_calculos = functools.partial(st.cache_data, max_entries=MAX_ENTRADAS_CACHE, ttl=TTL_CACHE, show_spinner=False)
+
+# Cada nota ocupa más de 1 MB (la imagen de la plantilla) y el .zip del lote
+# queda en memoria hasta descargarlo: los lotes más grandes, con lote_notas.py
+MAX_SOLICITUDES_LOTE = 50
+
+
+@st.cache_resource
+def pool_recibos():
+    # Un único pool para todas las sesiones. Sus procesos se crean desde un
+    # servidor aparte (forkserver) y no copiando el proceso de Streamlit, que
+    # tiene varios hilos en ejecución. Con un solo núcleo no hay pool: enviar
+    # los recibos a otro proceso solo agrega tiempo
+    if procesos_disponibles() < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=procesos_disponibles(),
+                               mp_context=multiprocessing.get_context("forkserver"))
+
+
+@st.cache_resource
+def registro_auditoria():
+    # Uno por proceso; escribe en segundo plano (ver auditoria.py)
+    return Auditoria()
+
+
+@cache_calculos
+def leer_recibos(ids, _contenidos, _archivos):
+    # La clave son los ids de los archivos subidos: los PDF no se vuelven a
+    # hashear en cada recarga. Varios recibos se leen en paralelo
+    recibos = parsear_recibos(_contenidos, executor=pool_recibos())
+    # Se registra solo la primera lectura de cada recibo, no cada recarga
+    for archivo, recibo in zip(_archivos, recibos):
+        registro_auditoria().registrar("recibo", recibo.nombre, archivo=archivo, bruto=recibo.bruto,
+                                       deducciones=recibo.deducciones, neto=recibo.neto, error=recibo.error)
+    return recibos
+
+
+@cache_calculos
+def generar_cuadro_cacheado(monto, cuotas, tasa_anual):
+    from amortizacion import generar_cuadro_amortizacion
+    return generar_cuadro_amortizacion(monto, cuotas, tasa_anual)
+
+
+# La cuota y los montos máximos no se guardan: calcularlos lleva
+# menos tiempo que consultar la caché
+
+# Con st.fragment (st.experimental_fragment en versiones anteriores) un cambio
+# dentro de una sección vuelve a ejecutar solo esa sección. Si la versión de
+# Streamlit no lo tiene, las secciones se ejecutan con el resto del script.
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def fragmento(funcion):
+    return _fragment(funcion) if _fragment else funcion
+
 
 # Configuración de la página
 st.set_page_config(
@@ -18,6 +85,21 @@ st.set_page_config(
     layout="wide"
 )
 
+# Tiempos por etapa (ver metricas.py): solo con SIMULADOR_METRICAS o SIMULADOR_PERFIL.
+# Cada etapa se anota con la sesión y el número de recarga de esa sesión
+if METRICAS_ACTIVAS:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    def sesion_y_recarga():
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None, None
+        return ctx.session_id, st.session_state.get('recargas')
+
+    st.session_state.recargas = st.session_state.get('recargas', 0) + 1
+    contar_recarga()
+    definir_contexto(sesion_y_recarga)
+
 # Estilos CSS personalizados
 st.markdown("""
     <style>
@@ -34,286 +116,13 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Funciones auxiliares (mantenidas del código original)
-def extraer_sueldos(pdf_path):
-    try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-
-        lines = text.splitlines()
-        
-        # Extraer nombre (buscando después de "Apellido y Nombre:")
-        nombre = None
-        for i, line in enumerate(lines):
-            if "Apellido y Nombre:" in line:
-                # Buscar la siguiente línea que contenga una coma (formato "Apellido, Nombre")
-                j = i + 1
-                while j < len(lines):
-                    next_line = lines[j].strip()
-                    if "," in next_line and not any(field in next_line for field in ["Categoria:", "Cargo:", "Egreso:", "Codigo", "Concepto"]):
-                        nombre = next_line
-                        # Convertir de "Apellido, Nombre" a "Nombre Apellido"
-                        if "," in nombre:
-                            apellido, nombre_persona = nombre.split(",", 1)
-                            nombre = f"{nombre_persona.strip()} {apellido.strip()}"
-                        break
-                    j += 1
-                break
-        
-        # Extraer montos
-        monto_regex = re.compile(r'^\s*(\d{1,3}(?:\.\d{3})*,\d{2})\s*$')
-        valores = [match.group(1) for line in lines if (match := monto_regex.match(line))]
-
-        if len(valores) < 2:
-            st.error("No se encontraron suficientes montos claros para bruto/neto")
-            return None, None, None
-
-        valores_f = [float(v.replace('.', '').replace(',', '.')) for v in valores]
-        sueldo_neto = valores_f[-1]
-        candidatos = [v for v in valores_f[-6:] if v > 1_000_000]
-        if not candidatos:
-            st.error("No se detectó un valor alto para el sueldo bruto.")
-            return None, None, None
-        sueldo_bruto = max(candidatos)
-
-        return sueldo_bruto, sueldo_neto, nombre
-
-    except Exception as e:
-        st.error(f"Error al procesar PDF: {e}")
-        return None, None, None
-
-def calcular_bloques_forzado(pdf_path):
-    from resources import CODIGOS_BRUTO, CODIGOS_DEDUCCIONES
-    try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-
-        lines = text.splitlines()
-        bruto = 0.0
-        deducciones = 0.0
-        detectados = []
-
-        def es_monto(s):
-            return re.match(r'^-?\d{1,3}(?:\.\d{3})*,\d{2}$', s)
-        def es_cantidad(s):
-            return re.match(r'^\d{1,3}(?:\.\d{3})*,\d{2}$', s)
-
-        # Buscar la sección de conceptos
-        inicio_conceptos = False
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            # Detectar inicio de la sección de conceptos
-            if line == "Codigo":
-                inicio_conceptos = True
-                i += 1
-                continue
-            if inicio_conceptos:
-                for codigo in CODIGOS_BRUTO.keys():
-                    # Solo considerar líneas que empiezan por el código, espacio y una letra (no número ni coma)
-                    if re.match(rf'^{codigo} [A-Za-z]', line):
-                        # Caso 1: cantidad y luego monto
-                        if i + 2 < len(lines) and es_cantidad(lines[i+1].strip()) and es_monto(lines[i+2].strip()):
-                            valor_str = lines[i+2].strip()
-                            valor = float(valor_str.replace('.', '').replace(',', '.'))
-                            bruto += valor
-                            detectados.append((codigo, valor, "REM", line))
-                        # Caso 2: monto directo
-                        elif i + 1 < len(lines) and es_monto(lines[i+1].strip()):
-                            valor_str = lines[i+1].strip()
-                            valor = float(valor_str.replace('.', '').replace(',', '.'))
-                            bruto += valor
-                            detectados.append((codigo, valor, "REM", line))
-                        break
-                for codigo in CODIGOS_DEDUCCIONES.keys():
-                    if re.match(rf'^{codigo} [A-Za-z]', line):
-                        if i + 2 < len(lines) and es_cantidad(lines[i+1].strip()) and es_monto(lines[i+2].strip()):
-                            valor_str = lines[i+2].strip()
-                            valor = float(valor_str.replace('.', '').replace(',', '.'))
-                            deducciones += valor
-                            detectados.append((codigo, valor, "DED", line))
-                        elif i + 1 < len(lines) and es_monto(lines[i+1].strip()):
-                            valor_str = lines[i+1].strip()
-                            valor = float(valor_str.replace('.', '').replace(',', '.'))
-                            deducciones += valor
-                            detectados.append((codigo, valor, "DED", line))
-                        break
-            i += 1
-
-        neto = bruto - deducciones
-        return round(bruto, 2), round(deducciones, 2), round(neto, 2), detectados
-
-    except Exception as e:
-        st.error(f"Error al procesar PDF: {e}")
-        return None, None, None, None
-
-def calcular_cuota(monto, cuotas, tasa_anual):
-    tasa_mensual = (tasa_anual / 100) / 12
-    if tasa_mensual == 0:
-        return monto / cuotas
-    cuota = monto * (tasa_mensual * (1 + tasa_mensual)**cuotas) / ((1 + tasa_mensual)**cuotas - 1)
-    return cuota
-
-def generar_cuadro_amortizacion(monto, cuotas, tasa_anual):
-    tasa_mensual = (tasa_anual / 100) / 12
-    cuota_total = calcular_cuota(monto, cuotas, tasa_anual)
-    saldo = monto
-    cuadro = []
-    for i in range(1, cuotas + 1):
-        interes = saldo * tasa_mensual
-        amortizacion = cuota_total - interes
-        saldo -= amortizacion
-        cuadro.append({
-            "Cuota N°": i,
-            "Cuota total ($)": round(cuota_total, 2),
-            "Interés ($)": round(interes, 2),
-            "Amortización ($)": round(amortizacion, 2),
-            "Saldo restante ($)": round(saldo if saldo > 0 else 0, 2)
-        })
-    return pd.DataFrame(cuadro)
-
-def generar_nota(monto, cuotas, tasa_final, cuota, fecha, nombre, area, sector, motivo, motivo_detallado, puesto, neto):
-    def formatear_fecha_larga(fecha):
-        meses = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
-                 'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
-        return f"{fecha.day} de {meses[fecha.month - 1]} del {fecha.year}"
-
-    def tercer_viernes(fecha_base):
-        year = fecha_base.year
-        month = fecha_base.month
-        count = 0
-        for day in range(1, 32):
-            try:
-                fecha = datetime(year, month, day)
-                if fecha.weekday() == 4:
-                    count += 1
-                    if count == 3:
-                        return fecha
-            except ValueError:
-                break
-        return fecha_base
-
-    def ultimo_dia_habil_del_mes(fecha_base):
-        anio, mes = fecha_base.year, fecha_base.month
-        ultimo_dia = calendar.monthrange(anio, mes)[1]
-        venc = datetime(anio, mes, ultimo_dia)
-        while venc.weekday() >= 5:
-            venc -= timedelta(days=1)
-        return venc
-
-    try:
-        fecha_directorio = tercer_viernes(fecha)
-        vencimiento = ultimo_dia_habil_del_mes(fecha)
-        texto_letras = num2words(monto, lang='es').replace("uno", "un").capitalize() + " pesos"
-        neto_menos_cuota = neto - cuota
-
-        datos = {
-            "<nombre>": nombre,
-            "<area>": area,
-            "<sector>": sector,
-            "<fecha>": formatear_fecha_larga(fecha),
-            "<fecha_directorio>": formatear_fecha_larga(fecha_directorio),
-            "<monto>": f"${monto:,.2f}",
-            "<cuotas>": str(cuotas),
-            "<motivo>": motivo,
-            "<motivo_detallado>": motivo_detallado,
-            "<monto_en_letras>": texto_letras,
-            "<tasa>": f"{tasa_final:.2f}%",
-            "<vencimiento>": formatear_fecha_larga(vencimiento),
-            "<puesto>": puesto,
-            "<neto_menos_cuota>": f"${neto_menos_cuota:,.2f}"
-        }
-
-        # Buscar la plantilla
-        plantilla = None
-        for archivo in os.listdir(os.getcwd()):
-            if archivo.endswith(".docx") and "nota" in archivo.lower():
-                doc_test = Document(archivo)
-                texts = [p.text for p in doc_test.paragraphs]
-                texts += [c.text for t in doc_test.tables for r in t.rows for c in r.cells]
-                if any("<" in t and ">" in t for t in texts):
-                    plantilla = archivo
-                    break
-
-        if not plantilla:
-            st.error("❌ No se encontró una plantilla con '<>' en la carpeta.")
-            return None
-
-        doc = Document(plantilla)
-
-        # Reemplazar marcadores en párrafos
-        for p in doc.paragraphs:
-            for k, v in datos.items():
-                if k in p.text:
-                    for r in p.runs:
-                        r.text = r.text.replace(k, v)
-                # Reemplazo global por si el tag está partido en runs
-                if k in p.text:
-                    p.text = p.text.replace(k, v)
-
-        # Reemplazar marcadores en tablas
-        for t in doc.tables:
-            for r in t.rows:
-                for c in r.cells:
-                    for p in c.paragraphs:
-                        for k, v in datos.items():
-                            if k in p.text:
-                                for run in p.runs:
-                                    run.text = run.text.replace(k, v)
-                            # Reemplazo global por si el tag está partido en runs
-                            if k in p.text:
-                                p.text = p.text.replace(k, v)
-
-        # Reemplazar marcadores en texto plano de celdas (por si acaso)
-        for t in doc.tables:
-            for r in t.rows:
-                for c in r.cells:
-                    for k, v in datos.items():
-                        if k in c.text:
-                            c.text = c.text.replace(k, v)
-
-        # Intentar agregar la tabla de amortización
-        try:
-            df_amort = generar_cuadro_amortizacion(monto, cuotas, tasa_final)
-            for i, p in enumerate(doc.paragraphs):
-                if "<cuadro_amortizacion>" in p.text:
-                    p.text = p.text.replace("<cuadro_amortizacion>", "")
-                    table = doc.add_table(rows=1, cols=len(df_amort.columns))
-                    table.style = 'Table Grid'
-                    hdr_cells = table.rows[0].cells
-                    for j, col in enumerate(df_amort.columns):
-                        hdr_cells[j].text = str(col)
-                    for _, row in df_amort.iterrows():
-                        row_cells = table.add_row().cells
-                        for j, val in enumerate(row):
-                            row_cells[j].text = str(val)
-                    p._p.addnext(table._tbl)
-                    break
-        except Exception as e:
-            st.error(f"No se pudo insertar la tabla: {e}")
-
-        # Guardar en memoria
-        docx_bytes = io.BytesIO()
-        doc.save(docx_bytes)
-        docx_bytes.seek(0)
-        
-        return docx_bytes
-
-    except Exception as e:
-        st.error(f"❌ Error al generar nota: {e}")
-        return None
-
 # Interfaz principal
 st.title("Sistema de Adelantos Haberes")
 
 # Instrucciones justo después del título
 st.markdown("""
 ### Instrucciones
-1. Cargue su recibo de sueldo en formato PDF
+1. Cargue sus recibos de sueldo en formato PDF (uno o varios meses)
 2. Complete sus datos personales en el panel lateral
 3. Ingrese los datos del préstamo deseado
 4. Simule el préstamo para ver el cuadro de amortización
@@ -343,41 +152,75 @@ with st.sidebar:
 st.header("Datos del Préstamo")
 col1, col2 = st.columns(2)
 
-with col1:
-    st.subheader("Carga de Recibo de Sueldo")
-    uploaded_file = st.file_uploader("Seleccione el recibo de sueldo (PDF)", type=['pdf'])
-    
-    if uploaded_file is not None:
-        # Guardar el archivo temporalmente
-        with open("temp.pdf", "wb") as f:
-            f.write(uploaded_file.getvalue())
-        
-        # Extraer desglose y cálculos correctos
-        bruto, deducciones, neto, detectados = calcular_bloques_forzado("temp.pdf")
-        
-        # Extraer nombre (opcional, solo para el campo)
-        _, _, nombre_detectado = extraer_sueldos("temp.pdf")
-        
+ETIQUETAS_CRITERIO = {"promedio": "Promedio", "minimo": "Mínimo", "mediana": "Mediana"}
+
+
+@fragmento
+def seccion_recibo():
+    st.subheader("Carga de Recibos de Sueldo")
+    uploaded_files = st.file_uploader("Seleccione los recibos de sueldo (PDF)", type=['pdf'],
+                                      accept_multiple_files=True)
+    sueldos_anteriores = (st.session_state.get('bruto'), st.session_state.get('neto'))
+
+    if uploaded_files:
+        from elegibilidad import CRITERIOS_BASE, calcular_base_sueldos
+
+        # Leer los recibos una sola vez (reutiliza el resultado en cada rerun)
+        with etapa("subida"):
+            contenidos = [f.getvalue() for f in uploaded_files]
+        with etapa("lectura_recibos"):
+            recibos = leer_recibos(tuple(f.file_id for f in uploaded_files), contenidos,
+                                   [f.name for f in uploaded_files])
+        for archivo, recibo in zip(uploaded_files, recibos):
+            if recibo.error:
+                st.error(f"{archivo.name}: {recibo.error}" if len(recibos) > 1 else recibo.error)
+        nombre_detectado = next((r.nombre for r in recibos if r.nombre), None)
+
+        criterio = CRITERIO_BASE_SUELDO
+        if len(recibos) > 1:
+            # Detalle por mes: solo las columnas con algún valor
+            filas = [fila_recibo(archivo.name, recibo) for archivo, recibo in zip(uploaded_files, recibos)]
+            columnas = [c for c in COLUMNAS if c not in ("nombre", "error") and any(f[c] is not None for f in filas)]
+            st.dataframe(filas, use_container_width=True, hide_index=True, column_order=columnas)
+            opciones = list(CRITERIOS_BASE)
+            criterio = st.selectbox("Sueldo a considerar", opciones, index=opciones.index(CRITERIO_BASE_SUELDO),
+                                    format_func=ETIQUETAS_CRITERIO.get)
+
+        try:
+            bruto, neto = calcular_base_sueldos(recibos, criterio)
+        except ValueError:
+            bruto = neto = None
+
         if bruto is not None and neto is not None:
             st.session_state['bruto'] = bruto
             st.session_state['neto'] = neto
-            
+
             # Mostrar solo los totales
-            st.success(f"Sueldo bruto: ${bruto:,.2f}")
-            st.success(f"Sueldo neto: ${neto:,.2f}")
-            
+            validos = sum(r.bruto is not None and r.neto is not None for r in recibos)
+            detalle = f" ({ETIQUETAS_CRITERIO[criterio].lower()} de {validos} recibos)" if validos > 1 else ""
+            st.success(f"Sueldo bruto{detalle}: ${bruto:,.2f}")
+            st.success(f"Sueldo neto{detalle}: ${neto:,.2f}")
+
             # Si se detectó un nombre, actualizar el campo inmediatamente
             if nombre_detectado and nombre_detectado != st.session_state.nombre_usuario:
                 st.session_state.nombre_usuario = nombre_detectado
                 st.query_params["nombre"] = nombre_detectado
                 st.rerun()  # Forzar la actualización de la interfaz
         else:
-            st.error("No se pudieron extraer los datos del PDF. Por favor, ingréselos manualmente.")
+            st.error("No se pudieron extraer los datos de los PDF. Por favor, ingréselos manualmente.")
             bruto = st.number_input("Sueldo bruto", min_value=0.0, step=1000.0)
             neto = st.number_input("Sueldo neto", min_value=0.0, step=1000.0)
             st.session_state['bruto'] = bruto
             st.session_state['neto'] = neto
 
+    # Los montos máximos dependen del sueldo y están en otra sección
+    if _fragment and (st.session_state.get('bruto'), st.session_state.get('neto')) != sueldos_anteriores:
+        st.rerun()
+
+
+with col1:
+    seccion_recibo()
+
 with col2:
     st.subheader("Parámetros del Préstamo")
     
@@ -399,100 +242,237 @@ with col2:
     monto_formateado = f"${monto:,.2f}"
     st.markdown(f"**Monto ingresado:** {monto_formateado}")
     
-    cuotas = st.number_input("Cantidad de cuotas", min_value=1, max_value=18, step=1)
+    cuotas = st.number_input("Cantidad de cuotas", min_value=1, max_value=CUOTAS_MAXIMAS, step=1)
     tasa_anual = st.number_input("Tasa anual (%)", min_value=0.0, step=0.1)
-    tasa_mensual = tasa_anual / 12
     fecha = st.date_input("Fecha de solicitud")
 
-# Sección de simulación a ancho completo
-st.header("Simulación")
-if st.button("Simular", key="simular_button"):
-    if 'bruto' not in st.session_state or 'neto' not in st.session_state:
-        st.error("Por favor, cargue primero el recibo de sueldo")
-        st.stop()
 
-    bruto = st.session_state['bruto']
-    neto = st.session_state['neto']
+@fragmento
+def seccion_simulacion(monto, cuotas, tasa_anual, fecha, usuario):
+    # `usuario`: (nombre, area, sector, motivo, motivo_detallado, puesto) del panel lateral
+    tasa_mensual = tasa_anual / 12
 
-    # Validaciones
-    if cuotas < 1 or cuotas > 18:
-        st.error("La cantidad de cuotas debe ser entre 1 y 18.")
-        st.stop()
-    
-    if monto > TOPE_MAXIMO_PRESTAMO:
-        st.error(f"El monto excede el tope máximo permitido de ${TOPE_MAXIMO_PRESTAMO:,.2f}.")
-        st.stop()
-    
-    if monto > 3 * bruto:
-        st.error("El monto excede 3 veces el sueldo bruto.")
-        st.stop()
-
-    cuota = calcular_cuota(monto, cuotas, tasa_anual)
-
-    if cuota > 0.3 * neto:
-        st.error("La cuota mensual excede el 30% del sueldo neto.")
-        st.stop()
-
-    # Mostrar resumen
-    st.subheader("Resumen de la simulación")
-    col_resumen1, col_resumen2 = st.columns(2)
-    with col_resumen1:
-        st.write(f"Monto solicitado: ${monto:,.2f}")
-        st.write(f"Cantidad de cuotas: {cuotas}")
-        st.write(f"Cuota mensual estimada: ${cuota:,.2f}")
-    with col_resumen2:
-        st.write(f"Tasa anual: {tasa_anual:.2f}%")
-        st.write(f"Tasa mensual: {tasa_mensual:.2f}%")
-
-    # Generar cuadro de amortización
-    st.subheader("Cuadro de Amortización")
-    df_amort = generar_cuadro_amortizacion(monto, cuotas, tasa_anual)
-    st.dataframe(
-        df_amort,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Cuota N°": st.column_config.NumberColumn("Cuota N°", format="%d"),
-            "Cuota total ($)": st.column_config.NumberColumn("Cuota total ($)", format="$%.2f"),
-            "Interés ($)": st.column_config.NumberColumn("Interés ($)", format="$%.2f"),
-            "Amortización ($)": st.column_config.NumberColumn("Amortización ($)", format="$%.2f"),
-            "Saldo restante ($)": st.column_config.NumberColumn("Saldo restante ($)", format="$%.2f")
+    # Sección de simulación a ancho completo
+    st.header("Simulación")
+
+    # Montos máximos permitidos para cada cantidad de cuotas con la tasa ingresada
+    if 'bruto' in st.session_state and 'neto' in st.session_state:
+        from elegibilidad import calcular_montos_maximos
+        st.subheader("Montos máximos por cantidad de cuotas")
+        df_maximos = calcular_montos_maximos(st.session_state['bruto'], st.session_state['neto'], tasa_anual)
+        st.dataframe(
+            df_maximos,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Cuotas": st.column_config.NumberColumn("Cuotas", format="%d"),
+                "Monto máximo ($)": st.column_config.NumberColumn("Monto máximo ($)", format="$%.2f"),
+                "Cuota ($)": st.column_config.NumberColumn("Cuota ($)", format="$%.2f"),
+                "Límite": st.column_config.TextColumn("Límite")
+            }
+        )
+
+    if st.button("Simular", key="simular_button"):
+        if 'bruto' not in st.session_state or 'neto' not in st.session_state:
+            st.error("Por favor, cargue primero el recibo de sueldo")
+            st.stop()
+
+        bruto = st.session_state['bruto']
+        neto = st.session_state['neto']
+
+        # Validaciones
+        from elegibilidad import validar_prestamo
+        with etapa("simulacion"):
+            try:
+                cuota = validar_prestamo(monto, cuotas, tasa_anual, bruto, neto)
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+            df_amort = generar_cuadro_cacheado(monto, cuotas, tasa_anual)
+        registro_auditoria().registrar("simulacion", usuario[0], monto=monto, cuotas=cuotas, tasa_anual=tasa_anual,
+                                       cuota=cuota, fecha=fecha, bruto=bruto, neto=neto)
+
+        # Mostrar resumen
+        st.subheader("Resumen de la simulación")
+        col_resumen1, col_resumen2 = st.columns(2)
+        with col_resumen1:
+            st.write(f"Monto solicitado: ${monto:,.2f}")
+            st.write(f"Cantidad de cuotas: {cuotas}")
+            st.write(f"Cuota mensual estimada: ${cuota:,.2f}")
+        with col_resumen2:
+            st.write(f"Tasa anual: {tasa_anual:.2f}%")
+            st.write(f"Tasa mensual: {tasa_mensual:.2f}%")
+
+        # Generar cuadro de amortización
+        st.subheader("Cuadro de Amortización")
+        st.dataframe(
+            df_amort,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Cuota N°": st.column_config.NumberColumn("Cuota N°", format="%d"),
+                "Cuota total ($)": st.column_config.NumberColumn("Cuota total ($)", format="$%.2f"),
+                "Interés ($)": st.column_config.NumberColumn("Interés ($)", format="$%.2f"),
+                "Amortización ($)": st.column_config.NumberColumn("Amortización ($)", format="$%.2f"),
+                "Saldo restante ($)": st.column_config.NumberColumn("Saldo restante ($)", format="$%.2f")
+            }
+        )
+
+        # Guardar los datos de la simulación en el estado
+        st.session_state.simulacion_realizada = True
+        # Una nota generada con la simulación anterior ya no corresponde
+        st.session_state.nota_docx = None
+        st.session_state.datos_simulacion = {
+            'monto': monto,
+            'cuotas': cuotas,
+            'tasa_anual': tasa_anual,
+            'cuota': cuota,
+            'fecha': fecha,
+            'neto': neto,
+            'cuadro': df_amort
         }
-    )
 
-    # Guardar los datos de la simulación en el estado
-    st.session_state.simulacion_realizada = True
-    st.session_state.datos_simulacion = {
-        'monto': monto,
-        'cuotas': cuotas,
-        'tasa_anual': tasa_anual,
-        'cuota': cuota,
-        'fecha': fecha,
-        'neto': neto
-    }
+    # Mostrar botón de generación de nota solo si la simulación fue exitosa
+    if st.session_state.simulacion_realizada:
+        st.markdown("---")
+        st.subheader("Generación de Nota")
+        if st.button("Generar Nota", key="generar_nota_button"):
+            if not all(usuario):
+                st.error("Por favor complete todos los datos del usuario en el panel lateral")
+                st.stop()
 
-# Mostrar botón de generación de nota solo si la simulación fue exitosa
-if st.session_state.simulacion_realizada:
+            datos = st.session_state.datos_simulacion
+            try:
+                with etapa("nota"):
+                    docx_bytes = generar_nota(
+                        datos['monto'], datos['cuotas'], datos['tasa_anual'],
+                        datos['cuota'], datos['fecha'],
+                        *usuario, datos['neto'],
+                        cuadro=datos['cuadro']
+                    )
+            except ErrorNota as e:
+                st.error(f"❌ {e}")
+                docx_bytes = None
+
+            if docx_bytes is not None:
+                # Los bytes se guardan una vez y se sirven como descarga binaria
+                st.session_state.nota_docx = docx_bytes.getvalue()
+                registro_auditoria().registrar(
+                    "nota", usuario[0], area=usuario[1], sector=usuario[2], motivo=usuario[3], puesto=usuario[5],
+                    monto=datos['monto'], cuotas=datos['cuotas'], tasa_anual=datos['tasa_anual'],
+                    cuota=datos['cuota'], fecha=datos['fecha'], neto=datos['neto'],
+                    sha256=hashlib.sha256(st.session_state.nota_docx).hexdigest(),
+                    bytes=len(st.session_state.nota_docx)
+                )
+                st.success("✅ Nota generada correctamente. Use el botón para descargarla.")
+                st.session_state.nota_generada = True
+            else:
+                st.error("❌ No se pudo generar la nota. Por favor, intente nuevamente.") 
+
+        if st.session_state.get('nota_docx'):
+            with etapa("descarga"):
+                st.download_button(
+                    "Descargar Nota de Solicitud",
+                    st.session_state.nota_docx,
+                    file_name="nota.docx",
+                    mime=MIME_DOCX,
+                    key="descargar_nota_button"
+                )
+
+
+seccion_simulacion(monto, cuotas, tasa_anual, fecha, (nombre, area, sector, motivo, motivo_detallado, puesto))
+
+
+def descartar_zip_lote():
+    # Descargado el .zip, la sesión no lo sigue guardando; el manifiesto queda a la vista
+    _, manifiesto, segundos = st.session_state.lote_notas
+    st.session_state.lote_notas = (None, manifiesto, segundos)
+
+
+# Generación de notas para un lote de solicitudes aprobadas
+@fragmento
+def seccion_lote():
     st.markdown("---")
-    st.subheader("Generación de Nota")
-    if st.button("Generar Nota", key="generar_nota_button"):
-        if not all([nombre, area, sector, motivo, motivo_detallado, puesto]):
-            st.error("Por favor complete todos los datos del usuario en el panel lateral")
+    st.header("Generación de Notas por Lote")
+    st.markdown(f"Cargue un CSV con las columnas: {', '.join(COLUMNAS_SOLICITUD)} (fecha en formato AAAA-MM-DD) y, "
+                "opcional, bruto (sin él no se verifica el múltiplo del sueldo bruto).")
+    archivo_lote = st.file_uploader("Seleccione el CSV de solicitudes", type=['csv'], key="lote_csv")
+
+    if archivo_lote is not None and st.button("Generar notas del lote", key="generar_lote_button"):
+        try:
+            solicitudes = list(leer_solicitudes(io.TextIOWrapper(io.BytesIO(archivo_lote.getvalue()),
+                                                                 encoding="utf-8-sig")))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        if len(solicitudes) > MAX_SOLICITUDES_LOTE:
+            st.error(f"❌ El lote tiene {len(solicitudes)} solicitudes; desde la app se admiten hasta "
+                     f"{MAX_SOLICITUDES_LOTE}. Para lotes más grandes use `python lote_notas.py solicitudes.csv "
+                     f"-o notas.zip`.")
             st.stop()
+        with st.spinner("Generando notas..."), tempfile.TemporaryFile() as zip_lote:
+            # forkserver: el proceso de Streamlit tiene otros hilos que pueden tener locks tomados
+            manifiesto, segundos = generar_lote(solicitudes, zip_lote,
+                                                mp_context=multiprocessing.get_context("forkserver"),
+                                                auditoria=registro_auditoria())
+            zip_lote.seek(0)
+            st.session_state.lote_notas = (zip_lote.read(), manifiesto, segundos)
+
+    if st.session_state.get('lote_notas'):
+        zip_bytes, manifiesto, segundos = st.session_state.lote_notas
+        errores = sum(r['estado'] == 'error' for r in manifiesto)
+        st.success(f"✅ {len(manifiesto) - errores} notas generadas en {segundos:.1f} s; {errores} solicitudes con error.")
+        st.dataframe(manifiesto, use_container_width=True, hide_index=True)
+        if zip_bytes is not None:
+            st.download_button("Descargar notas (.zip)", zip_bytes, file_name="notas.zip", mime="application/zip",
+                               on_click=descartar_zip_lote)
+        else:
+            st.info("El .zip ya se descargó; vuelva a generar el lote para obtenerlo de nuevo.")
+
 
-        datos = st.session_state.datos_simulacion
-        docx_bytes = generar_nota(
-            datos['monto'], datos['cuotas'], datos['tasa_anual'],
-            datos['cuota'], datos['fecha'],
-            nombre, area, sector, motivo, motivo_detallado, puesto, datos['neto']
+seccion_lote()
+
+
+# Flujos mensuales de toda la cartera de adelantos
+@fragmento
+def seccion_cartera():
+    st.markdown("---")
+    st.header("Proyección de la Cartera")
+    st.markdown("Cargue un CSV con las columnas: monto, cuotas, tasa, fecha (fecha en formato AAAA-MM-DD); "
+                "sirve el mismo CSV del lote de notas.")
+    archivo_cartera = st.file_uploader("Seleccione el CSV de la cartera", type=['csv'], key="cartera_csv")
+    texto_escenarios = st.text_input("Escenarios de tasa: puntos porcentuales a sumar a cada préstamo, "
+                                     "separados por espacios", value="0 5 -5", key="escenarios_cartera")
+
+    if archivo_cartera is not None and st.button("Proyectar flujos", key="proyectar_cartera_button"):
+        from cartera import leer_cartera, proyectar_cartera
+        try:
+            escenarios = [float(v) for v in texto_escenarios.replace(",", ".").split()] or [0.0]
+            cartera = leer_cartera(io.BytesIO(archivo_cartera.getvalue()))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        with st.spinner("Proyectando flujos..."):
+            inicio = time.perf_counter()
+            flujos = proyectar_cartera(cartera, escenarios)
+            st.session_state.proyeccion_cartera = (flujos, len(cartera), time.perf_counter() - inicio)
+
+    if st.session_state.get('proyeccion_cartera') is not None:
+        flujos, prestamos, segundos = st.session_state.proyeccion_cartera
+        st.success(f"✅ {prestamos} préstamos proyectados en {segundos:.1f} s.")
+        cobros = flujos.pivot(index="Mes", columns="Escenario (pp)", values="Cobro total ($)")
+        cobros.columns = [f"{v:+g} pp" for v in cobros.columns]
+        st.line_chart(cobros)
+        st.dataframe(
+            flujos,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                c: st.column_config.NumberColumn(c, format="$%.2f") for c in flujos.columns if c.endswith("($)")
+            }
         )
+        st.download_button("Descargar proyección (.csv)", flujos.to_csv(index=False).encode("utf-8"),
+                           file_name="flujos.csv", mime="text/csv", key="descargar_cartera_button")
 
-        if docx_bytes is not None:
-            # Crear botón de descarga
-            b64 = base64.b64encode(docx_bytes.getvalue()).decode()
-            href = f'<a href="data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,{b64}" download="nota.docx">Descargar Nota de Solicitud</a>'
-            st.markdown(href, unsafe_allow_html=True)
-            st.success("✅ Nota generada correctamente. Haga clic en el enlace para descargarla.")
-            st.session_state.nota_generada = True
-        else:
-            st.error("❌ No se pudo generar la nota. Por favor, intente nuevamente.") 
+
+seccion_cartera()
@@ -0,0 +1,207 @@
+"""
+Registro de auditoría en SQLite: recibos leídos, simulaciones y notas
+generadas, con la fecha y hora y el nombre del empleado.
+
+registrar() solo encola el evento; un hilo aparte los escribe en lotes, en
+una transacción por lote, así la interfaz no espera al disco. La base usa
+WAL: varios procesos de la app pueden escribir en el mismo archivo y las
+consultas no bloquean las escrituras.
+
+Cada evento guarda tipo, momento (ISO 8601, hora local), nombre y el resto
+de los datos como JSON; hay índices por nombre y por momento.
+
+La base es auditoria.db en el directorio actual, o el archivo de la
+variable de entorno SIMULADOR_AUDITORIA. La app, lote_notas.py y api.py
+registran en la misma base.
+
+Uso:
+    python auditoria.py --nombre "Juan Pérez" --desde 2026-10-01
+    python auditoria.py --tipo nota --desde 2026-10-01 --hasta 2026-10-31 -o notas_octubre.csv
+"""
+
+import argparse
+import atexit
+import csv
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+RUTA_AUDITORIA = os.environ.get("SIMULADOR_AUDITORIA", "auditoria.db")
+TIPOS_EVENTO = ("recibo", "simulacion", "nota")
+COLUMNAS_EVENTO = ["id", "tipo", "momento", "nombre", "datos"]
+
+# Eventos por transacción y espera máxima antes de escribir un lote incompleto
+EVENTOS_POR_LOTE = 200
+INTERVALO_ESCRITURA = 1.0  # segundos
+# Espera ante otro proceso que está escribiendo, antes de dar error
+ESPERA_BLOQUEO = 10.0  # segundos
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    momento TEXT NOT NULL,
+    nombre TEXT COLLATE NOCASE,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS eventos_nombre ON eventos (nombre, momento);
+CREATE INDEX IF NOT EXISTS eventos_momento ON eventos (momento);
+"""
+
+
+def conectar(ruta):
+    conexion = sqlite3.connect(ruta, timeout=ESPERA_BLOQUEO)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute("PRAGMA journal_mode=WAL")
+    # Con WAL, NORMAL no pierde consistencia ante un corte y evita un fsync por transacción
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+class Auditoria:
+    def __init__(self, ruta=RUTA_AUDITORIA):
+        self.ruta = ruta
+        # Crea la base y el esquema antes del primer evento
+        conectar(ruta).close()
+        self.pendientes = queue.Queue()
+        self.hilo = None
+        self.hilo_lock = threading.Lock()
+        self.errores = 0
+
+    def registrar(self, tipo, nombre, **datos):
+        """Encola un evento; vuelve de inmediato. Las fechas de `datos` se guardan como texto."""
+        if tipo not in TIPOS_EVENTO:
+            raise ValueError(f"Tipo de evento desconocido: {tipo}")
+        momento = datetime.now().isoformat(timespec="milliseconds")
+        self.pendientes.put((tipo, momento, nombre or None, json.dumps(datos, ensure_ascii=False, default=str)))
+        self._iniciar()
+
+    def _iniciar(self):
+        # El hilo escritor se crea con el primer evento
+        if self.hilo is None:
+            with self.hilo_lock:
+                if self.hilo is None:
+                    self.hilo = threading.Thread(target=self._escribir, name="auditoria", daemon=True)
+                    self.hilo.start()
+                    atexit.register(self.cerrar)
+
+    def _escribir(self):
+        conexion = conectar(self.ruta)
+        fin = False
+        while not fin:
+            lote = [self.pendientes.get()]
+            limite = time.monotonic() + INTERVALO_ESCRITURA
+            # None (enviado por cerrar) escribe lo pendiente sin esperar más
+            while len(lote) < EVENTOS_POR_LOTE and lote[-1] is not None:
+                espera = limite - time.monotonic()
+                try:
+                    lote.append(self.pendientes.get(timeout=espera) if espera > 0
+                                else self.pendientes.get_nowait())
+                except queue.Empty:
+                    break
+            fin = lote[-1] is None
+            eventos = [e for e in lote if e is not None]
+            try:
+                with conexion:
+                    conexion.executemany(
+                        "INSERT INTO eventos (tipo, momento, nombre, datos) VALUES (?, ?, ?, ?)", eventos
+                    )
+            except sqlite3.Error as e:
+                # Un fallo de la base no debe cortar la app; queda el aviso
+                self.errores += len(eventos)
+                print(f"⚠️ No se pudieron guardar {len(eventos)} eventos de auditoría: {e}", file=sys.stderr)
+            for _ in lote:
+                self.pendientes.task_done()
+        conexion.close()
+
+    def vaciar(self):
+        """Espera a que estén escritos todos los eventos encolados hasta ahora."""
+        if self.hilo is not None:
+            self.pendientes.join()
+
+    def cerrar(self):
+        if self.hilo is not None and self.hilo.is_alive():
+            self.pendientes.put(None)
+            self.hilo.join()
+
+    def consultar(self, nombre=None, tipo=None, desde=None, hasta=None, limite=None):
+        """Eventos que cumplen los filtros, del más antiguo al más reciente, como diccionarios.
+
+        `desde` y `hasta` son fechas (inclusive); `nombre` no distingue
+        mayúsculas. `datos` se devuelve ya decodificado.
+        """
+        condiciones, parametros = [], []
+        if nombre:
+            condiciones.append("nombre = ?")
+            parametros.append(nombre)
+        if tipo:
+            condiciones.append("tipo = ?")
+            parametros.append(tipo)
+        if desde:
+            condiciones.append("momento >= ?")
+            parametros.append(desde.isoformat())
+        if hasta:
+            condiciones.append("momento < ?")
+            parametros.append((hasta + timedelta(days=1)).isoformat())
+        consulta = "SELECT * FROM eventos"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY momento, id"
+        if limite:
+            consulta += f" LIMIT {int(limite)}"
+
+        conexion = conectar(self.ruta)
+        try:
+            filas = conexion.execute(consulta, parametros).fetchall()
+        finally:
+            conexion.close()
+        return [dict(fila, datos=json.loads(fila["datos"])) for fila in filas]
+
+    def exportar(self, salida, **filtros):
+        """Escribe los eventos de consultar(**filtros) en `salida` (.csv o .jsonl); devuelve cuántos."""
+        eventos = self.consultar(**filtros)
+        with open(salida, "w", newline="", encoding="utf-8") as archivo:
+            if salida.lower().endswith(".jsonl"):
+                for evento in eventos:
+                    archivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+            else:
+                # Una columna por cada dato que aparece en algún evento
+                claves = list(dict.fromkeys(k for e in eventos for k in e["datos"]))
+                escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_EVENTO[:-1] + claves)
+                escritor.writeheader()
+                for evento in eventos:
+                    escritor.writerow({**{c: evento[c] for c in COLUMNAS_EVENTO[:-1]}, **evento["datos"]})
+        return len(eventos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta y exporta el registro de auditoría.")
+    parser.add_argument("--base", default=RUTA_AUDITORIA, help="Archivo SQLite de auditoría")
+    parser.add_argument("--nombre", default=None, help="Nombre del empleado")
+    parser.add_argument("--tipo", choices=TIPOS_EVENTO, default=None)
+    parser.add_argument("--desde", type=date.fromisoformat, default=None, help="Fecha AAAA-MM-DD (inclusive)")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="Fecha AAAA-MM-DD (inclusive)")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="Archivo .csv o .jsonl; sin él, los eventos se muestran en pantalla")
+    args = parser.parse_args(argv)
+
+    auditoria = Auditoria(args.base)
+    filtros = dict(nombre=args.nombre, tipo=args.tipo, desde=args.desde, hasta=args.hasta)
+    if args.salida:
+        cantidad = auditoria.exportar(args.salida, **filtros)
+        print(f"✅ {cantidad} eventos -> {args.salida}")
+    else:
+        for evento in auditoria.consultar(**filtros):
+            print(f"{evento['momento']}  {evento['tipo']:10s}  {evento['nombre'] or '-':30s}  "
+                  f"{json.dumps(evento['datos'], ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
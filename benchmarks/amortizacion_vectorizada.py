@@ -0,0 +1,88 @@
+"""
+Compara el cuadro de amortización cuota a cuota (un DataFrame armado desde
+filas por préstamo) con el motor vectorizado de amortizacion.py sobre
+1e5-1e6 escenarios de (monto, cuotas, tasa), y verifica que los valores
+redondeados coincidan exactamente.
+
+Uso: python -m benchmarks.amortizacion_vectorizada [escenarios] [muestra]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import calcular_cronogramas, calcular_cuota
+
+# Préstamos por bloque, para acotar la memoria de los arrays de (préstamos, cuotas)
+TAMANO_BLOQUE = 100_000
+
+
+def cuadro_original(monto, cuotas, tasa_anual):
+    # Copia de la implementación anterior, usada como referencia
+    tasa_mensual = (tasa_anual / 100) / 12
+    cuota_total = monto / cuotas if tasa_mensual == 0 else \
+        monto * (tasa_mensual * (1 + tasa_mensual)**cuotas) / ((1 + tasa_mensual)**cuotas - 1)
+    saldo = monto
+    cuadro = []
+    for i in range(1, cuotas + 1):
+        interes = saldo * tasa_mensual
+        amortizacion = cuota_total - interes
+        saldo -= amortizacion
+        cuadro.append({
+            "Cuota N°": i,
+            "Cuota total ($)": round(cuota_total, 2),
+            "Interés ($)": round(interes, 2),
+            "Amortización ($)": round(amortizacion, 2),
+            "Saldo restante ($)": round(saldo if saldo > 0 else 0, 2)
+        })
+    return pd.DataFrame(cuadro)
+
+
+def escenarios(cantidad, rng):
+    montos = rng.uniform(10_000, 5_000_000, cantidad).round(2)
+    cuotas = rng.integers(1, 19, cantidad)
+    tasas = np.where(rng.random(cantidad) < 0.05, 0.0, rng.uniform(0, 150, cantidad).round(1))
+    return montos, cuotas, tasas
+
+
+def main(cantidad=1_000_000, muestra=2_000):
+    rng = np.random.default_rng(0)
+    montos, cuotas, tasas = escenarios(cantidad, rng)
+
+    inicio = time.perf_counter()
+    for i in range(muestra):
+        cuadro_original(montos[i], int(cuotas[i]), tasas[i])
+    t_original = (time.perf_counter() - inicio) / muestra
+
+    inicio = time.perf_counter()
+    calcular_cuota(montos, cuotas, tasas)
+    t_cuotas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for desde in range(0, cantidad, TAMANO_BLOQUE):
+        bloque = slice(desde, desde + TAMANO_BLOQUE)
+        cronograma = calcular_cronogramas(montos[bloque], cuotas[bloque], tasas[bloque])
+        if desde == 0:
+            primero = cronograma
+    t_cronogramas = time.perf_counter() - inicio
+
+    # Los valores de la muestra deben ser idénticos a los del cálculo original
+    for i in range(min(muestra, TAMANO_BLOQUE)):
+        n = int(cuotas[i])
+        # Con floats de Python, como los recibe la app: con escalares de NumPy,
+        # ** y round() del cálculo original usarían las versiones de NumPy
+        esperado = cuadro_original(float(montos[i]), n, float(tasas[i])).to_numpy()[:, 1:]
+        obtenido = np.column_stack([primero.cuota_total[i, :n], primero.interes[i, :n],
+                                    primero.amortizacion[i, :n], primero.saldo[i, :n]])
+        assert (esperado == obtenido).all(), (montos[i], n, tasas[i])
+
+    print(f"{cantidad} escenarios (muestra de {muestra} verificada contra el cálculo original)")
+    print(f"  original, estimado:    {t_original * cantidad:8.1f} s  ({t_original * 1e6:.0f} µs/préstamo)")
+    print(f"  solo cuotas:           {t_cuotas:8.2f} s")
+    print(f"  cronogramas completos: {t_cronogramas:8.2f} s  (x{t_original * cantidad / t_cronogramas:.0f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
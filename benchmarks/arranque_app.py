@@ -0,0 +1,78 @@
+"""
+Arranque en frío de app.py: tiempo de la primera ejecución del script en un
+intérprete nuevo y módulos importados durante esa ejecución, medidos con
+python -X importtime.
+
+Se miden dos casos: la primera carga de la página (sin recibo) y la primera
+carga con un recibo ya leído (sueldos en session_state, que muestra la tabla
+de montos máximos). En el primero no debería importarse ninguno de los
+módulos de PESADOS; si alguno se importa, el script termina con código 1.
+
+Uso: PYTHONPATH=. python -m benchmarks.arranque_app
+"""
+
+import subprocess
+import sys
+
+PESADOS = ("fitz", "pandas", "numpy", "docx", "num2words", "pyarrow")
+MARCA = "--- primera ejecución ---"
+
+PRIMERA_EJECUCION = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+SESION
+print(MARCA, file=sys.stderr, flush=True)
+inicio = time.perf_counter()
+at.run()
+print("--- segundos", time.perf_counter() - inicio, file=sys.stderr)
+assert not at.exception, at.exception
+"""
+
+CASOS = {
+    "primera carga": "",
+    "con recibo leído": 'at.session_state["bruto"] = 1_650_000.0; at.session_state["neto"] = 1_419_000.0',
+}
+
+
+def medir(sesion):
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PRIMERA_EJECUCION.replace("SESION", sesion).replace("MARCA", repr(MARCA))],
+        capture_output=True, text=True, check=True,
+    )
+    lineas = proceso.stderr.split(MARCA, 1)[1].splitlines()
+    segundos = next(float(l.split()[-1]) for l in lineas if l.startswith("--- segundos"))
+
+    # "import time: propio | acumulado | módulo"; la sangría indica quién lo importó
+    importados, pesados = {}, {}
+    for linea in lineas:
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if not acumulado.strip().isdigit():
+            continue
+        if not nombre.startswith("  "):
+            importados[nombre.strip()] = int(acumulado) / 1e6
+        if nombre.strip() in PESADOS:
+            pesados[nombre.strip()] = int(acumulado) / 1e6
+    return segundos, importados, pesados
+
+
+def main():
+    regresion = False
+    for caso, sesion in CASOS.items():
+        segundos, importados, pesados = medir(sesion)
+        print(f"{caso}: {segundos * 1000:.0f} ms, {sum(importados.values()) * 1000:.0f} ms en importaciones")
+        for modulo, s in sorted(pesados.items(), key=lambda x: -x[1]):
+            print(f"    {modulo:12s} {s * 1000:6.0f} ms")
+        if caso == "primera carga" and pesados:
+            regresion = True
+    if regresion:
+        print(f"❌ La primera carga importa módulos pesados ({', '.join(PESADOS)})")
+        return 1
+    print("✅ La primera carga no importa módulos pesados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
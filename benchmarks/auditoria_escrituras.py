@@ -0,0 +1,109 @@
+"""
+Registro de auditoría: latencia de registrar() (p50/p99) frente a escribir
+cada evento con su propia transacción, escritura simultánea desde varios
+procesos sobre la misma base (WAL) y consulta por nombre con el índice.
+
+Uso: python -m benchmarks.auditoria_escrituras [eventos] [procesos]
+"""
+
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+from auditoria import Auditoria, conectar
+
+NOMBRES = [f"EMPLEADO {i:04d}" for i in range(500)]
+
+
+def datos_simulacion(rng):
+    return dict(monto=rng.uniform(10_000, 5_000_000), cuotas=rng.randint(1, 18), tasa_anual=48.0,
+                cuota=rng.uniform(1_000, 500_000), fecha=date(2026, 10, 17), bruto=1_650_000.0, neto=1_419_000.0)
+
+
+def percentiles(tiempos):
+    cortes = statistics.quantiles(tiempos, n=100)
+    return cortes[49] * 1e6, cortes[98] * 1e6
+
+
+def medir_directo(ruta, eventos, rng):
+    # Lo que haría la app sin la cola: una transacción (y su espera al disco) por evento
+    conexion = conectar(ruta)
+    tiempos = []
+    for _ in range(eventos):
+        inicio = time.perf_counter()
+        with conexion:
+            conexion.execute("INSERT INTO eventos (tipo, momento, nombre, datos) VALUES (?, ?, ?, ?)",
+                             ("simulacion", "2026-10-17T00:00:00", rng.choice(NOMBRES), str(datos_simulacion(rng))))
+        tiempos.append(time.perf_counter() - inicio)
+    conexion.close()
+    return tiempos
+
+
+def medir_encolado(ruta, eventos, rng):
+    registro = Auditoria(ruta)
+    tiempos = []
+    for _ in range(eventos):
+        inicio = time.perf_counter()
+        registro.registrar("simulacion", rng.choice(NOMBRES), **datos_simulacion(rng))
+        tiempos.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    registro.cerrar()
+    return tiempos, time.perf_counter() - inicio
+
+
+def escribir_desde_proceso(ruta, eventos, semilla):
+    rng = random.Random(semilla)
+    registro = Auditoria(ruta)
+    for _ in range(eventos):
+        registro.registrar("nota", rng.choice(NOMBRES), **datos_simulacion(rng))
+    registro.cerrar()
+    return registro.errores
+
+
+def main(eventos=5000, procesos=4):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "directo.db")
+        conectar(ruta).close()
+        p50, p99 = percentiles(medir_directo(ruta, eventos, rng))
+        print(f"una transacción por evento  p50 {p50:8.1f} µs   p99 {p99:8.1f} µs")
+
+        ruta = os.path.join(carpeta, "auditoria.db")
+        tiempos, cierre = medir_encolado(ruta, eventos, rng)
+        p50, p99 = percentiles(tiempos)
+        print(f"registrar() encolado        p50 {p50:8.1f} µs   p99 {p99:8.1f} µs   "
+              f"(escritura pendiente al cerrar: {cierre * 1000:.0f} ms)")
+
+        # Varios procesos de la app escribiendo en la misma base a la vez
+        inicio = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(procesos) as pool:
+            errores = pool.starmap(escribir_desde_proceso, [(ruta, eventos, s) for s in range(procesos)])
+        segundos = time.perf_counter() - inicio
+        total = conectar(ruta).execute("SELECT count(*) FROM eventos").fetchone()[0]
+        assert sum(errores) == 0 and total == eventos * (procesos + 1), (errores, total)
+        print(f"{procesos} procesos x {eventos} eventos en {segundos:.2f} s, {total} eventos en la base, sin errores")
+
+        registro = Auditoria(ruta)
+        plan = conectar(ruta).execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM eventos WHERE nombre = ? ORDER BY momento, id", ("x",)
+        ).fetchall()
+        assert any("eventos_nombre" in fila["detail"] for fila in plan), [tuple(f) for f in plan]
+        inicio = time.perf_counter()
+        encontrados = registro.consultar(nombre=NOMBRES[7].lower())
+        print(f"consulta por nombre con el índice eventos_nombre: {len(encontrados)} eventos en "
+              f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+        salida = os.path.join(carpeta, "auditoria.csv")
+        inicio = time.perf_counter()
+        exportados = registro.exportar(salida, desde=date(2026, 1, 1))
+        print(f"exportación: {exportados} eventos en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        assert exportados == total
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,167 @@
+"""
+Prueba de carga del servicio de api.py, levantado dentro del mismo proceso
+en un puerto libre. Verifica primero las respuestas de cada endpoint (y que
+cada nota quede en una base de auditoría temporal) y después envía
+solicitudes concurrentes a /simulacion, /recibo y /nota, informando
+solicitudes por segundo y latencias p50/p95/p99.
+
+Mientras se generan notas consulta /salud cada 10 ms: como la lectura de
+recibos y la generación de notas corren en el pool de procesos, el bucle de
+eventos debería seguir respondiendo en pocos milisegundos.
+
+Uso: python -m benchmarks.carga_api [solicitudes] [concurrencia] [procesos]
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from tornado.httpclient import AsyncHTTPClient
+
+from amortizacion import calcular_cuota
+from api import servidor_local
+from auditoria import Auditoria
+from benchmarks.recibos_sinteticos import generar_recibo
+from resources import REGLAS_ELEGIBILIDAD
+
+SOLICITUD_NOTA = {
+    "nombre": "Juan Pérez", "area": "Administración", "sector": "Tesorería", "puesto": "Analista",
+    "motivo": "Vacaciones", "motivo_detallado": "será destinado a gastos de viaje",
+    "monto": 1_500_000, "cuotas": 12, "tasa": 48, "fecha": "2025-05-16", "neto": 2_000_000,
+}
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(p / 100 * len(valores)))]
+
+
+async def enviar(cliente, url, ruta, cuerpo, json_=True):
+    return await cliente.fetch(
+        url + ruta, method="POST", raise_error=False,
+        body=json.dumps(cuerpo) if json_ else cuerpo,
+    )
+
+
+async def verificar(cliente, url, recibos, auditoria):
+    respuesta = await enviar(cliente, url, "/simulacion", {"monto": 1_000_000, "cuotas": 12, "tasa": 48,
+                                                            "bruto": 2_000_000, "neto": 2_000_000})
+    datos = json.loads(respuesta.body)
+    assert respuesta.code == 200 and datos["cuota"] == calcular_cuota(1_000_000, 12, 48)
+    assert len(datos["cuadro"]) == 12 and datos["cuadro"][-1]["Saldo restante ($)"] == 0
+
+    assert datos["reglas_no_aplicadas"] == []
+
+    respuesta = await enviar(cliente, url, "/simulacion", {"monto": 1_000_000, "cuotas": 12, "tasa": 48, "bruto": 100})
+    assert respuesta.code == 422 and "sueldo bruto" in json.loads(respuesta.body)["error"]
+
+    respuesta = await enviar(cliente, url, "/simulacion", {"monto": 1_000_000, "cuotas": 12, "tasa": 48})
+    assert respuesta.code == 200 and len(json.loads(respuesta.body)["reglas_no_aplicadas"]) == 2
+
+    # Lo que la app no deja ingresar tampoco se acepta en el servicio
+    for invalido in ({"monto": -1_000}, {"monto": 0}, {"tasa": -5}, {"cuotas": 2.7}, {"monto": "nan"},
+                     {"tasa": "inf"}, {"neto": "nan"}, {"bruto": "nan"}):
+        for ruta, cuerpo in (("/simulacion", {"monto": 1_000_000, "cuotas": 12, "tasa": 48, "neto": 2_000_000}),
+                             ("/nota", dict(SOLICITUD_NOTA))):
+            respuesta = await enviar(cliente, url, ruta, {**cuerpo, **invalido})
+            assert respuesta.code == 422 and "error" in json.loads(respuesta.body), (ruta, invalido, respuesta.code)
+
+    for pdf, esperado in recibos[:5]:
+        respuesta = await enviar(cliente, url, "/recibo", pdf, json_=False)
+        datos = json.loads(respuesta.body)
+        assert respuesta.code == 200 and (datos["bruto"], datos["neto"]) == (esperado["bruto"], esperado["neto"])
+
+    respuesta = await enviar(cliente, url, "/nota", SOLICITUD_NOTA)
+    assert respuesta.code == 200 and respuesta.body[:2] == b"PK", respuesta.body[:200]
+    assert json.loads(respuesta.headers["X-Reglas-No-Aplicadas"]) == [REGLAS_ELEGIBILIDAD[1]["etiqueta"]]
+
+    # Con el sueldo bruto, /nota aplica también el múltiplo del bruto
+    respuesta = await enviar(cliente, url, "/nota", {**SOLICITUD_NOTA, "bruto": 100_000})
+    assert respuesta.code == 422 and "sueldo bruto" in json.loads(respuesta.body)["error"]
+    respuesta = await enviar(cliente, url, "/nota", {**SOLICITUD_NOTA, "bruto": 2_000_000})
+    assert respuesta.code == 200 and json.loads(respuesta.headers["X-Reglas-No-Aplicadas"]) == []
+
+    # Solo las dos notas generadas quedan en la auditoría, con el SHA-256 del .docx entregado
+    auditoria.vaciar()
+    notas = auditoria.consultar(tipo="nota")
+    assert [(n["nombre"], n["datos"]["origen"], n["datos"]["bruto"]) for n in notas] == [
+        (SOLICITUD_NOTA["nombre"], "api", None), (SOLICITUD_NOTA["nombre"], "api", 2_000_000)], notas
+    assert notas[-1]["datos"]["sha256"] == hashlib.sha256(respuesta.body).hexdigest()
+
+
+async def cargar(cliente, url, ruta, cuerpos, concurrencia, json_=True):
+    latencias = []
+    cola = list(cuerpos)
+
+    async def trabajador():
+        while cola:
+            cuerpo = cola.pop()
+            inicio = time.perf_counter()
+            respuesta = await enviar(cliente, url, ruta, cuerpo, json_)
+            assert respuesta.code == 200, (ruta, respuesta.code, respuesta.body[:200])
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return latencias, time.perf_counter() - inicio
+
+
+async def sondear_salud(cliente, url, detener):
+    latencias = []
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await cliente.fetch(url + "/salud")
+        latencias.append(time.perf_counter() - inicio)
+        await asyncio.sleep(0.01)
+    return latencias
+
+
+def informar(nombre, latencias, segundos):
+    print(f"{nombre:12s} {len(latencias):5d} sol. {len(latencias) / segundos:8.1f} sol/s | "
+          f"p50 {statistics.median(latencias) * 1000:7.1f} ms  p95 {percentil(latencias, 95) * 1000:7.1f} ms  "
+          f"p99 {percentil(latencias, 99) * 1000:7.1f} ms")
+
+
+async def principal(solicitudes, concurrencia, procesos):
+    rng = random.Random(0)
+    # Un recibo distinto por solicitud, para no medir la caché de recibos
+    recibos = [generar_recibo(rng) for _ in range(solicitudes)]
+    simulaciones = [{"monto": rng.randrange(100_000, 1_500_000, 1000), "cuotas": rng.randint(1, 18), "tasa": 48,
+                     "bruto": 2_000_000, "neto": 10_000_000} for _ in range(solicitudes)]
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Las notas de la prueba se registran en una base temporal, no en auditoria.db
+        auditoria = Auditoria(os.path.join(carpeta, "auditoria.db"))
+        async with servidor_local(procesos, auditoria=auditoria) as url:
+            cliente = AsyncHTTPClient(max_clients=concurrencia + 1)
+            await verificar(cliente, url, recibos, auditoria)
+            print(f"Respuestas verificadas; {concurrencia} solicitudes concurrentes")
+
+            informar("/simulacion", *await cargar(cliente, url, "/simulacion", simulaciones, concurrencia))
+            informar("/recibo", *await cargar(cliente, url, "/recibo", [pdf for pdf, _ in recibos], concurrencia,
+                                              json_=False))
+
+            detener = asyncio.Event()
+            sondeo = asyncio.create_task(sondear_salud(cliente, url, detener))
+            notas = [SOLICITUD_NOTA] * max(solicitudes // 10, concurrencia)
+            informar("/nota", *await cargar(cliente, url, "/nota", notas, concurrencia))
+            detener.set()
+            salud = await sondeo
+            print(f"/salud durante la generación de notas: p50 {statistics.median(salud) * 1000:.1f} ms, "
+                  f"p99 {percentil(salud, 99) * 1000:.1f} ms ({len(salud)} consultas)")
+
+        auditoria.cerrar()
+
+
+def main(solicitudes=500, concurrencia=16, procesos=None):
+    asyncio.run(principal(solicitudes, concurrencia, procesos))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Verifica que varias sesiones concurrentes lean cada una su propio recibo
+desde memoria y que el RSS del proceso se mantenga estable entre rondas:
+termina con error si crece más de CRECIMIENTO_MAXIMO_MB desde la primera
+ronda o más de CRECIMIENTO_MAXIMO_MB_SEGUNDA_MITAD en la segunda mitad.
+
+Uso: python -m benchmarks.concurrencia_recibos [sesiones] [rondas]
+"""
+
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.recibos_sinteticos import generar_recibo
+from recibos import parsear_recibo
+
+# Las primeras rondas suben el RSS algo más de 1 MB (cachés del asignador y de
+# MuPDF) y después queda estable; una pérdida por recibo sigue creciendo
+CRECIMIENTO_MAXIMO_MB = 4.0
+CRECIMIENTO_MAXIMO_MB_SEGUNDA_MITAD = 1.0
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        paginas = int(f.read().split()[1])
+    return paginas * 4096 / 1024 / 1024
+
+
+def verificar(contenido, esperado):
+    recibo = parsear_recibo(contenido)
+    assert recibo.error is None, recibo.error
+    assert recibo.nombre == esperado["nombre"], (recibo.nombre, esperado["nombre"])
+    assert recibo.bruto == esperado["bruto"], (recibo.bruto, esperado["bruto"])
+    assert recibo.neto == esperado["neto"], (recibo.neto, esperado["neto"])
+
+
+def main(sesiones=16, rondas=20):
+    rng = random.Random(0)
+    recibos = [generar_recibo(rng) for _ in range(sesiones)]
+
+    with ThreadPoolExecutor(max_workers=sesiones) as pool:
+        for ronda in range(1, rondas + 1):
+            list(pool.map(lambda r: verificar(*r), recibos))
+            if ronda == 1:
+                rss_inicial = rss_mb()
+            if ronda == max(1, rondas // 2):
+                rss_mitad = rss_mb()
+            print(f"ronda {ronda:3d}: RSS {rss_mb():7.1f} MB")
+        # Con los hilos todavía vivos, como en las lecturas anteriores: al cerrar
+        # el pool se liberan sus pilas y eso ocultaría parte del crecimiento
+        rss_final = rss_mb()
+
+    crecimiento = rss_final - rss_inicial
+    segunda_mitad = rss_final - rss_mitad
+    assert crecimiento <= CRECIMIENTO_MAXIMO_MB, f"el RSS creció {crecimiento:.1f} MB"
+    assert segunda_mitad <= CRECIMIENTO_MAXIMO_MB_SEGUNDA_MITAD, \
+        f"el RSS siguió creciendo en la segunda mitad: {segunda_mitad:.1f} MB"
+    print(f"{sesiones} sesiones x {rondas} rondas OK, crecimiento de RSS: {crecimiento:.1f} MB "
+          f"({segunda_mitad:.1f} MB en la segunda mitad)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
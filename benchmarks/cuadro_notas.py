@@ -0,0 +1,60 @@
+"""
+Inserción del cuadro de amortización en la nota: celda por celda con
+iterrows()/add_row() (versión anterior) contra las filas armadas como XML en
+una sola pasada (notas.insertar_cuadro). Verifica que el XML de la tabla
+resultante sea idéntico en ambos casos.
+
+Uso: python -m benchmarks.cuadro_notas [repeticiones]
+"""
+
+import statistics
+import sys
+import time
+
+from docx import Document
+from lxml import etree
+
+from amortizacion import generar_cuadro_amortizacion
+from notas import MARCADOR_CUADRO, insertar_cuadro
+
+# Cantidades de cuotas a comparar; las más largas corresponden a notas generadas en lote
+PLAZOS = (18, 120, 360)
+
+
+def insertar_cuadro_anterior(doc, parrafo, cuadro):
+    parrafo.text = parrafo.text.replace(MARCADOR_CUADRO, "")
+    table = doc.add_table(rows=1, cols=len(cuadro.columns))
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    for j, col in enumerate(cuadro.columns):
+        hdr_cells[j].text = str(col)
+    for _, row in cuadro.iterrows():
+        row_cells = table.add_row().cells
+        for j, val in enumerate(row):
+            row_cells[j].text = str(val)
+    parrafo._p.addnext(table._tbl)
+
+
+def medir(funcion, cuadro, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        doc = Document()
+        parrafo = doc.add_paragraph(f"Cuadro: {MARCADOR_CUADRO}")
+        inicio = time.perf_counter()
+        funcion(doc, parrafo, cuadro)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), etree.tostring(doc.tables[0]._tbl)
+
+
+def main(repeticiones=5):
+    for cuotas in PLAZOS:
+        cuadro = generar_cuadro_amortizacion(1_500_000, cuotas, 48)
+        anterior, xml_anterior = medir(insertar_cuadro_anterior, cuadro, repeticiones)
+        nuevo, xml_nuevo = medir(insertar_cuadro, cuadro, repeticiones)
+        assert xml_nuevo == xml_anterior, f"XML distinto con {cuotas} cuotas"
+        print(f"{cuotas:4d} cuotas: anterior {anterior * 1000:8.1f} ms | "
+              f"una pasada {nuevo * 1000:6.1f} ms | {anterior / nuevo:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
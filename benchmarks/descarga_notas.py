@@ -0,0 +1,61 @@
+"""
+Descarga de la nota: enlace data-URI en base64 dentro de st.markdown
+(versión anterior) contra st.download_button con los bytes del .docx.
+
+Para notas con cuadros de amortización largos compara los bytes enviados
+al navegador y la memoria máxima que se reserva para preparar la descarga.
+El download_button se mide con el mismo almacenamiento en memoria que usa
+Streamlit para servir el archivo.
+
+Uso: python -m benchmarks.descarga_notas
+"""
+
+import base64
+import tracemalloc
+from datetime import date
+
+from streamlit.runtime.media_file_storage import MediaFileKind
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from notas import MIME_DOCX, generar_nota
+
+PLAZOS = (18, 120, 360)
+
+
+def descarga_anterior(docx_bytes):
+    # Lo que enviaba app.py por el canal de markdown
+    b64 = base64.b64encode(docx_bytes.getvalue()).decode()
+    href = f'<a href="data:{MIME_DOCX};base64,{b64}" download="nota.docx">Descargar Nota de Solicitud</a>'
+    return len(href.encode())
+
+
+def descarga_binaria(docx_bytes, almacenamiento):
+    # Lo que hace st.download_button: guarda los bytes y envía solo la URL
+    datos = docx_bytes.getvalue()
+    url = almacenamiento.load_and_get_id(datos, MIME_DOCX, MediaFileKind.DOWNLOADABLE, "nota.docx")
+    return len(datos) + len(url)
+
+
+def medir(funcion, *args):
+    tracemalloc.start()
+    enviado = funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return enviado, pico
+
+
+def main():
+    for cuotas in PLAZOS:
+        nota = generar_nota(1_500_000, cuotas, 48.0, 150_000.0, date(2025, 5, 16), "Juan Pérez",
+                            "Administración", "Tesorería", "Vacaciones", "gastos de viaje", "Analista",
+                            1_400_000.0)
+        tamano = len(nota.getvalue())
+        anterior, pico_anterior = medir(descarga_anterior, nota)
+        binaria, pico_binaria = medir(descarga_binaria, nota, MemoryMediaFileStorage("/media"))
+        print(f"{cuotas:4d} cuotas, .docx {tamano / 2**20:5.2f} MiB")
+        print(f"     base64:   enviado {anterior / 2**20:5.2f} MiB, memoria {pico_anterior / 2**20:5.2f} MiB")
+        print(f"     binaria:  enviado {binaria / 2**20:5.2f} MiB, memoria {pico_binaria / 2**20:5.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Latencia de generación de la nota (p50/p99): flujo anterior, que busca la
+plantilla abriendo cada .docx de la carpeta y recorre todo el documento,
+contra la plantilla cacheada e indexada de notas.py. Verifica además que
+ambos flujos produzcan el mismo texto y que la plantilla cacheada no se
+vuelva a leer cuando cambian otros archivos de la carpeta (auditoria.db),
+pero sí cuando cambia la plantilla o aparece otra.
+
+Uso: python -m benchmarks.latencia_notas [repeticiones]
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import statistics
+import sys
+import time
+from datetime import date
+
+from docx import Document
+from num2words import num2words
+
+from amortizacion import generar_cuadro_amortizacion
+from benchmarks.cuadro_notas import insertar_cuadro_anterior
+import notas
+
+DATOS_NOTA = dict(
+    monto=1_500_000.0, cuotas=12, tasa_final=48.0, cuota=150_000.0, fecha=date(2025, 5, 16),
+    nombre="Juan Pérez", area="Administración", sector="Tesorería", motivo="Vacaciones",
+    motivo_detallado="será destinado a gastos de viaje", puesto="Analista", neto=1_400_000.0,
+)
+
+
+def reemplazar_en_parrafo(p, datos):
+    # Reemplazo anterior: cada marcador por separado, primero en los runs y
+    # después sobre el texto completo del párrafo
+    for k, v in datos.items():
+        if k in p.text:
+            for r in p.runs:
+                r.text = r.text.replace(k, v)
+        if k in p.text:
+            p.text = p.text.replace(k, v)
+
+
+def nota_anterior(monto, cuotas, tasa_final, cuota, fecha, nombre, area, sector, motivo, motivo_detallado, puesto, neto):
+    # Flujo anterior: buscar la plantilla en cada pedido y recorrer todo el documento
+    datos = {
+        "<nombre>": nombre, "<area>": area, "<sector>": sector,
+        "<fecha>": notas.formatear_fecha_larga(fecha),
+        "<fecha_directorio>": notas.formatear_fecha_larga(notas.tercer_viernes(fecha)),
+        "<monto>": f"${monto:,.2f}", "<cuotas>": str(cuotas), "<motivo>": motivo,
+        "<motivo_detallado>": motivo_detallado,
+        "<monto_en_letras>": num2words(monto, lang='es').replace("uno", "un").capitalize() + " pesos",
+        "<tasa>": f"{tasa_final:.2f}%",
+        "<vencimiento>": notas.formatear_fecha_larga(notas.ultimo_dia_habil_del_mes(fecha)),
+        "<puesto>": puesto, "<neto_menos_cuota>": f"${neto - cuota:,.2f}",
+    }
+    plantilla = None
+    for archivo in os.listdir(os.getcwd()):
+        if archivo.endswith(".docx") and "nota" in archivo.lower():
+            doc_test = Document(archivo)
+            texts = [p.text for p in doc_test.paragraphs]
+            texts += [c.text for t in doc_test.tables for r in t.rows for c in r.cells]
+            if any("<" in t and ">" in t for t in texts):
+                plantilla = archivo
+                break
+    doc = Document(plantilla)
+    for p in doc.paragraphs:
+        reemplazar_en_parrafo(p, datos)
+    for t in doc.tables:
+        for r in t.rows:
+            for c in r.cells:
+                for p in c.paragraphs:
+                    reemplazar_en_parrafo(p, datos)
+    for t in doc.tables:
+        for r in t.rows:
+            for c in r.cells:
+                for k, v in datos.items():
+                    if k in c.text:
+                        c.text = c.text.replace(k, v)
+    for p in doc.paragraphs:
+        if notas.MARCADOR_CUADRO in p.text:
+            insertar_cuadro_anterior(doc, p, generar_cuadro_amortizacion(monto, cuotas, tasa_final))
+            break
+    docx_bytes = io.BytesIO()
+    doc.save(docx_bytes)
+    docx_bytes.seek(0)
+    return docx_bytes
+
+
+def texto_documento(docx_bytes):
+    doc = Document(docx_bytes)
+    return ([p.text for p in doc.paragraphs],
+            [c.text for t in doc.tables for r in t.rows for c in r.cells])
+
+
+def percentiles(tiempos):
+    cortes = statistics.quantiles(tiempos, n=100)
+    return cortes[49] * 1000, cortes[98] * 1000
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(**DATOS_NOTA)
+        tiempos.append(time.perf_counter() - inicio)
+    return percentiles(tiempos)
+
+
+def verificar_cache_plantilla():
+    with tempfile.TemporaryDirectory() as carpeta:
+        shutil.copy("nota.docx", carpeta)
+        plantilla = notas.obtener_plantilla(carpeta)
+        # El registro de auditoría escribe en la misma carpeta en cada evento
+        for archivo in ("auditoria.db", "auditoria.db-wal", "otro.docx"):
+            with open(os.path.join(carpeta, archivo), "wb") as f:
+                f.write(b"x")
+        assert notas.obtener_plantilla(carpeta) is plantilla, "se volvió a leer por un archivo ajeno"
+
+        ruta = os.path.join(carpeta, "nota.docx")
+        os.utime(ruta, ns=(time.time_ns(), os.stat(ruta).st_mtime_ns + 1_000_000))
+        modificada = notas.obtener_plantilla(carpeta)
+        assert modificada is not plantilla, "no se volvió a leer la plantilla modificada"
+        shutil.copy(ruta, os.path.join(carpeta, "nota_nueva.docx"))
+        assert notas.obtener_plantilla(carpeta) is not modificada, "no se detectó la plantilla nueva"
+
+        # Una plantilla posible dañada es un ErrorNota, que la app muestra como error
+        with open(os.path.join(carpeta, "a_nota_danada.docx"), "wb") as f:
+            f.write(b"no es un docx")
+        try:
+            notas.generar_nota(**DATOS_NOTA, directorio=carpeta)
+        except notas.ErrorNota:
+            pass
+        else:
+            raise AssertionError("la plantilla dañada no lanzó ErrorNota")
+    print("caché de la plantilla: se mantiene con auditoria.db y se renueva con cambios en las plantillas; "
+          "una plantilla dañada lanza ErrorNota")
+
+
+def main(repeticiones=100):
+    assert texto_documento(nota_anterior(**DATOS_NOTA)) == texto_documento(notas.generar_nota(**DATOS_NOTA))
+    verificar_cache_plantilla()
+
+    for nombre, funcion in (("anterior", nota_anterior), ("cacheada", notas.generar_nota)):
+        p50, p99 = medir(funcion, repeticiones)
+        print(f"{nombre:9s} p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""
+Generación de notas por lotes: notas por segundo y memoria máxima del
+proceso principal para lotes de distinto tamaño. Como las notas se escriben
+en el .zip a medida que se generan, la memoria no debería crecer con el
+tamaño del lote. Verifica también el SHA-256 de cada nota en el manifiesto
+y que cada fila quede registrada en una base de auditoría temporal.
+
+Uso: python -m benchmarks.lote_notas [procesos] [tamaños...]
+"""
+
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+
+from auditoria import Auditoria
+from lote_notas import ARCHIVO_MANIFIESTO, generar_lote
+from lote_recibos import procesos_disponibles
+from resources import MOTIVOS
+
+
+def generar_solicitudes(cantidad, rng=None):
+    rng = rng or random.Random(0)
+    for i in range(cantidad):
+        yield {
+            "nombre": f"Empleado {i}", "area": "Administración", "sector": "Tesorería", "puesto": "Analista",
+            "motivo": rng.choice(MOTIVOS), "motivo_detallado": "será destinado a gastos personales",
+            "monto": str(rng.randrange(100_000, 2_000_000, 1000)), "cuotas": str(rng.randint(1, 18)),
+            "tasa": "48", "fecha": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "neto": "10000000",
+        }
+
+
+def main(procesos=None, *tamanos):
+    procesos = procesos or procesos_disponibles()
+    tamanos = tamanos or (50, 200)
+    with tempfile.TemporaryDirectory() as carpeta:
+        auditoria = Auditoria(os.path.join(carpeta, "auditoria.db"))
+        for cantidad in tamanos:
+            with tempfile.TemporaryFile() as salida:
+                tracemalloc.start()
+                manifiesto, segundos = generar_lote(generar_solicitudes(cantidad), salida, procesos,
+                                                    auditoria=auditoria)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                salida.seek(0)
+                with zipfile.ZipFile(salida) as zf:
+                    notas = len(zf.namelist()) - 1
+                    assert ARCHIVO_MANIFIESTO in zf.namelist()
+                    for registro in manifiesto:
+                        assert hashlib.sha256(zf.read(registro["archivo"])).hexdigest() == registro["sha256"]
+            assert notas == cantidad == len(manifiesto), (notas, cantidad)
+            print(f"{cantidad:5d} notas, {procesos} procesos: {segundos:6.1f} s ({cantidad / segundos:5.1f} notas/s), "
+                  f"memoria máxima del proceso principal {pico / 2**20:5.1f} MiB")
+
+        auditoria.vaciar()
+        eventos = auditoria.consultar(tipo="nota")
+        assert len(eventos) == sum(tamanos) and all(e["datos"]["origen"] == "lote" for e in eventos)
+        auditoria.cerrar()
+    print(f"✅ SHA-256 del manifiesto verificados; {len(eventos)} notas registradas en la auditoría")
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
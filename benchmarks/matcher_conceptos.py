@@ -0,0 +1,96 @@
+"""
+Compara el matcher de conceptos indexado por código con la búsqueda
+original (una regex nueva por código y por línea) sobre recibos sintéticos
+grandes y una tabla de conceptos ampliada a cientos de códigos.
+
+Uso: python -m benchmarks.matcher_conceptos [codigos] [filas] [repeticiones]
+"""
+
+import random
+import re
+import sys
+import time
+
+from benchmarks.recibos_sinteticos import formatear_monto
+from recibos import calcular_bloques_forzado, construir_indice_conceptos
+
+
+def calcular_bloques_original(lines, codigos_bruto, codigos_deducciones):
+    # Copia de la implementación anterior, usada como referencia
+    bruto = 0.0
+    deducciones = 0.0
+    detectados = []
+
+    def es_monto(s):
+        return re.match(r'^-?\d{1,3}(?:\.\d{3})*,\d{2}$', s)
+    def es_cantidad(s):
+        return re.match(r'^\d{1,3}(?:\.\d{3})*,\d{2}$', s)
+
+    inicio_conceptos = False
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if line == "Codigo":
+            inicio_conceptos = True
+            i += 1
+            continue
+        if inicio_conceptos:
+            for codigos, tipo in ((codigos_bruto, "REM"), (codigos_deducciones, "DED")):
+                for codigo in codigos.keys():
+                    if re.match(rf'^{codigo} [A-Za-z]', line):
+                        if i + 2 < len(lines) and es_cantidad(lines[i+1].strip()) and es_monto(lines[i+2].strip()):
+                            valor = float(lines[i+2].strip().replace('.', '').replace(',', '.'))
+                        elif i + 1 < len(lines) and es_monto(lines[i+1].strip()):
+                            valor = float(lines[i+1].strip().replace('.', '').replace(',', '.'))
+                        else:
+                            break
+                        if tipo == "REM":
+                            bruto += valor
+                        else:
+                            deducciones += valor
+                        detectados.append((codigo, valor, tipo, line))
+                        break
+        i += 1
+
+    neto = bruto - deducciones
+    return round(bruto, 2), round(deducciones, 2), round(neto, 2), detectados
+
+
+def generar_lineas(rng, codigos_bruto, codigos_deducciones, filas):
+    lineas = ["Apellido y Nombre:", "PEREZ, JUAN", "Codigo", "Concepto", "Cantidad", "Remunerativo", "Deducciones"]
+    codigos = list(codigos_bruto) + list(codigos_deducciones)
+    for _ in range(filas):
+        codigo = rng.choice(codigos)
+        lineas.append(f"{codigo} Concepto {codigo}")
+        if rng.random() < 0.5:
+            lineas.append(formatear_monto(rng.randint(1, 30)))
+        lineas.append(formatear_monto(rng.uniform(1_000, 2_000_000)))
+    lineas += ["Totales", formatear_monto(1), formatear_monto(1)]
+    return lineas
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+def main(codigos=500, filas=2000, repeticiones=5):
+    rng = random.Random(0)
+    codigos_bruto = {str(10 + i): {} for i in range(codigos // 2)}
+    codigos_deducciones = {str(7000 + i): {} for i in range(codigos - codigos // 2)}
+    conceptos = construir_indice_conceptos(codigos_bruto, codigos_deducciones)
+    lineas = generar_lineas(rng, codigos_bruto, codigos_deducciones, filas)
+
+    t_original, r_original = medir(lambda: calcular_bloques_original(lineas, codigos_bruto, codigos_deducciones), repeticiones)
+    t_indexado, r_indexado = medir(lambda: calcular_bloques_forzado(lineas, conceptos), repeticiones)
+    assert r_original == r_indexado, "los resultados difieren"
+
+    print(f"{codigos} códigos, {filas} filas ({len(lineas)} líneas)")
+    print(f"  original:  {t_original * 1000:9.2f} ms/recibo")
+    print(f"  indexado:  {t_indexado * 1000:9.2f} ms/recibo  (x{t_original / t_indexado:.0f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,116 @@
+"""
+Elegibilidad de toda una nómina: tiempo de elegibilidad.evaluar_nomina
+según la cantidad de empleados, con y sin un monto solicitado por
+empleado, y verificación fila por fila contra calcular_montos_maximos y
+validar_prestamo sobre una muestra (cuyo tiempo se extrapola). Verifica
+también que cada monto máximo sugerido pase validar_prestamo y que un
+centavo más no, con sueldos y tasas al azar (tasa 0 incluida).
+
+Uso: python -m benchmarks.nomina_elegibilidad [muestra] [tamaños...]
+"""
+
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from elegibilidad import SIN_DATOS, calcular_montos_maximos, evaluar_nomina, validar_prestamo
+from resources import CUOTAS_MAXIMAS, REGLAS_ELEGIBILIDAD, TOPE_MAXIMO_PRESTAMO
+
+TASA = 48.0
+MENSAJES = {regla["mensaje"]: regla["etiqueta"] for regla in REGLAS_ELEGIBILIDAD}
+
+
+def generar_nomina(cantidad, semilla=0):
+    rng = np.random.default_rng(semilla)
+    bruto = np.round(rng.lognormal(14.3, 0.6, cantidad), 2)
+    neto = np.round(bruto * rng.uniform(0.7, 0.9, cantidad), 2)
+    # Algunos recibos ilegibles, como en la salida de lote_recibos.py
+    bruto[rng.random(cantidad) < 0.01] = np.nan
+    return pd.DataFrame({
+        "nombre": [f"EMPLEADO {i}" for i in range(cantidad)],
+        "bruto": bruto,
+        "neto": neto,
+        "cuotas": rng.integers(1, CUOTAS_MAXIMAS + 1, cantidad),
+        "monto": np.round(rng.uniform(0, 1.2 * TOPE_MAXIMO_PRESTAMO, cantidad), 2),
+    })
+
+
+def por_empleado(nomina):
+    # Lo que haría falta sin el evaluador: las funciones de la app, una fila a la vez
+    filas = []
+    for e in nomina.itertuples():
+        if np.isnan(e.bruto):
+            filas.append((False, None, SIN_DATOS, SIN_DATOS))
+            continue
+        maximo = calcular_montos_maximos(e.bruto, e.neto, TASA).iloc[e.cuotas - 1]
+        try:
+            validar_prestamo(e.monto, e.cuotas, TASA, e.bruto, e.neto)
+            elegible, incumplida = True, ""
+        except ValueError as error:
+            elegible, incumplida = False, MENSAJES[str(error)]
+        filas.append((elegible, maximo["Monto máximo ($)"], maximo["Límite"], incumplida))
+    return filas
+
+
+def verificar_maximos(cantidad, semilla=0):
+    rng = np.random.default_rng(semilla)
+    casos = [(319793.35, 237309.01, 32.7)] + [
+        (round(bruto, 2), round(bruto * rng.uniform(0.5, 0.95), 2), tasa)
+        for bruto, tasa in zip(rng.lognormal(12.5, 1.0, cantidad).tolist(),
+                               rng.choice([0.0, 12.5, 32.7, 48.0, 99.9], cantidad).tolist())
+    ]
+    for bruto, neto, tasa in casos:
+        maximos = calcular_montos_maximos(bruto, neto, tasa)
+        for cuotas, maximo in zip(maximos["Cuotas"].tolist(), maximos["Monto máximo ($)"].tolist()):
+            validar_prestamo(maximo, cuotas, tasa, bruto, neto)
+            try:
+                validar_prestamo((round(maximo * 100) + 1) / 100, cuotas, tasa, bruto, neto)
+            except ValueError:
+                continue
+            raise AssertionError(f"{maximo} + 0,01 también es válido ({bruto}, {neto}, {tasa}, {cuotas} cuotas)")
+    return len(casos) * CUOTAS_MAXIMAS
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main(muestra=2000, *tamanos):
+    tamanos = tamanos or (10_000, 50_000, 500_000)
+
+    nomina = generar_nomina(muestra)
+    inicio = time.perf_counter()
+    esperado = por_empleado(nomina)
+    por_fila = (time.perf_counter() - inicio) / muestra
+    evaluacion = evaluar_nomina(nomina, TASA)
+    for fila, (elegible, maximo, limite, incumplida) in zip(evaluacion.itertuples(index=False), esperado):
+        assert fila.Elegible == elegible and fila.Límite == limite, (fila, elegible, limite)
+        assert fila[-1] == incumplida, (fila, incumplida)
+        assert maximo is None or fila[-4] == maximo, (fila, maximo)
+    print(f"muestra de {muestra} empleados: coincide con validar_prestamo y calcular_montos_maximos "
+          f"({por_fila * 1000:.2f} ms por empleado)")
+    print(f"{verificar_maximos(muestra)} montos máximos: pasan validar_prestamo y un centavo más no")
+
+    for cantidad in tamanos:
+        nomina = generar_nomina(cantidad)
+        sueldos = nomina[["nombre", "bruto", "neto"]]
+        maximos = medir(lambda: evaluar_nomina(sueldos, TASA))
+        solicitudes = medir(lambda: evaluar_nomina(nomina, TASA))
+        print(f"{cantidad:>8,} empleados: montos máximos {maximos * 1000:7.1f} ms, "
+              f"con monto y cuotas por empleado {solicitudes * 1000:7.1f} ms "
+              f"(por empleado estimado: {por_fila * cantidad:7.1f} s)")
+
+    resumen = evaluar_nomina(generar_nomina(tamanos[0]), TASA)["Límite"].value_counts()
+    print(resumen.to_string())
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
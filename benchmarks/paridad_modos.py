@@ -0,0 +1,76 @@
+"""
+Paridad y rendimiento entre los modos de extracción "layout" y "texto".
+
+Sobre recibos sintéticos verifica que ambos modos den el mismo resultado y
+coincidan con los valores generados; con las columnas en otro orden o sin la
+etiqueta "Totales" antes de los totales (que el modo texto puede confundir con
+una cantidad seguida de un monto) verifica que el modo layout siga leyendo
+bien los montos. Informa tiempo y memoria
+asignada por recibo en cada modo.
+
+Uso: python -m benchmarks.paridad_modos [recibos]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.recibos_sinteticos import generar_recibo
+from recibos import MODOS_EXTRACCION, parsear_recibo
+
+# Remunerativo y deducciones antes que la cantidad
+COLUMNAS_REORDENADAS = {"codigo": 40, "remunerativo": 300, "deduccion": 390, "cantidad": 480}
+
+
+def coincide(recibo, esperado):
+    return (recibo.error is None
+            and recibo.nombre == esperado["nombre"]
+            and recibo.bruto == esperado["bruto"]
+            and recibo.deducciones == esperado["deducciones"]
+            and recibo.neto == esperado["neto"]
+            and [d[:3] for d in recibo.detectados] == esperado["detectados"])
+
+
+def medir(recibos, modo):
+    inicio = time.perf_counter()
+    for contenido, _ in recibos:
+        parsear_recibo(contenido, modo)
+    duracion = time.perf_counter() - inicio
+
+    # La memoria se mide en una pasada aparte para no distorsionar los tiempos
+    tracemalloc.start()
+    for contenido, _ in recibos:
+        parsear_recibo(contenido, modo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion / len(recibos), pico
+
+
+def main(cantidad=200):
+    rng = random.Random(0)
+    recibos = [generar_recibo(rng) for _ in range(cantidad)]
+
+    for contenido, esperado in recibos:
+        layout, texto = (parsear_recibo(contenido, modo) for modo in MODOS_EXTRACCION)
+        assert layout == texto, (layout, texto)
+        assert coincide(layout, esperado), (layout, esperado)
+    print(f"paridad layout/texto: {cantidad} recibos OK")
+
+    variantes = {
+        "columnas reordenadas": [generar_recibo(rng, COLUMNAS_REORDENADAS) for _ in range(cantidad)],
+        "sin etiqueta Totales": [generar_recibo(rng, etiqueta_totales=False) for _ in range(cantidad)],
+    }
+    for variante, generados in variantes.items():
+        for modo in MODOS_EXTRACCION:
+            correctos = sum(coincide(parsear_recibo(c, modo), e) for c, e in generados)
+            print(f"{variante}, modo {modo:6s}: {correctos}/{cantidad} correctos")
+        assert all(coincide(parsear_recibo(c, "layout"), e) for c, e in generados)
+
+    for modo in MODOS_EXTRACCION:
+        segundos, pico = medir(recibos, modo)
+        print(f"modo {modo:6s}: {segundos * 1000:6.2f} ms/recibo, pico asignado {pico / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""
+Proyección de la cartera: tiempo de cartera.proyectar_cartera según la
+cantidad de préstamos, y verificación contra la suma mes a mes de un
+generar_cuadro_amortizacion por préstamo sobre una muestra (cuyo tiempo se
+extrapola a la cartera completa).
+
+Uso: python -m benchmarks.proyeccion_cartera [muestra] [tamaños...]
+"""
+
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import generar_cuadro_amortizacion
+from cartera import proyectar_cartera
+from resources import CUOTAS_MAXIMAS, TOPE_MAXIMO_PRESTAMO
+
+
+def generar_cartera(cantidad, semilla=0):
+    rng = np.random.default_rng(semilla)
+    dias = rng.integers(0, 2 * 365, cantidad)
+    return pd.DataFrame({
+        "monto": np.round(rng.uniform(10_000, TOPE_MAXIMO_PRESTAMO, cantidad), 2),
+        "cuotas": rng.integers(1, CUOTAS_MAXIMAS + 1, cantidad),
+        "tasa": np.round(rng.uniform(0, 120, cantidad), 1),
+        "fecha": pd.Timestamp(2025, 1, 1) + pd.to_timedelta(dias, unit="D"),
+    })
+
+
+def proyeccion_por_prestamo(cartera):
+    # Un cuadro por préstamo, sumado mes a mes en Python
+    cobro = defaultdict(float)
+    saldo = defaultdict(float)
+    for p in cartera.itertuples():
+        cuadro = generar_cuadro_amortizacion(p.monto, p.cuotas, p.tasa)
+        for k, fila in enumerate(cuadro.itertuples(index=False)):
+            anio, mes = divmod(p.fecha.year * 12 + p.fecha.month - 1 + k, 12)
+            cobro[f"{anio}-{mes + 1:02d}"] += fila[1]
+            saldo[f"{anio}-{mes + 1:02d}"] += fila[4]
+    return cobro, saldo
+
+
+def main(muestra=500, *tamanos):
+    tamanos = tamanos or (10_000, 100_000, 1_000_000)
+
+    cartera = generar_cartera(muestra)
+    inicio = time.perf_counter()
+    cobro, saldo = proyeccion_por_prestamo(cartera)
+    por_prestamo = (time.perf_counter() - inicio) / muestra
+    flujos = proyectar_cartera(cartera)
+    meses = flujos["Mes"].tolist()
+    assert sorted(cobro) == sorted(m for m, n in zip(meses, flujos["Cuotas cobradas"]) if n)
+    assert np.allclose(flujos["Cobro total ($)"], [cobro[m] for m in meses], rtol=0, atol=0.005)
+    assert np.allclose(flujos["Saldo de capital ($)"], [saldo[m] for m in meses], rtol=0, atol=0.005)
+    print(f"muestra de {muestra} préstamos: coincide con un cuadro por préstamo "
+          f"({por_prestamo * 1000:.2f} ms por préstamo)")
+
+    for cantidad in tamanos:
+        cartera = generar_cartera(cantidad)
+        for escenarios in ((0.0,), (0.0, 5.0, -5.0)):
+            inicio = time.perf_counter()
+            proyectar_cartera(cartera, escenarios)
+            segundos = time.perf_counter() - inicio
+            print(f"{cantidad:>9,} préstamos x {len(escenarios)} escenarios: {segundos:6.2f} s "
+                  f"(por préstamo estimado: {por_prestamo * cantidad * len(escenarios):8.1f} s)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,102 @@
+"""
+Latencia de cada recarga de app.py durante una sesión típica, con y sin la
+caché de cálculos: cargar la página, completar el préstamo, escribir en el
+panel lateral, simular, seguir editando el panel lateral y generar la nota.
+
+La sesión se ejecuta con streamlit.testing (AppTest). El recibo se carga
+directamente en session_state, porque AppTest no permite subir archivos, de
+modo que la lectura del PDF (la parte cacheada más costosa) no forma parte
+de la sesión; "sin caché" vacía st.cache_data antes de cada recarga. Las
+simulaciones y notas de la sesión se registran en una base de auditoría
+temporal (SIMULADOR_AUDITORIA), no en auditoria.db.
+
+Uso: PYTHONPATH=. python -m benchmarks.recargas_app [repeticiones]
+"""
+
+import atexit
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+
+def por_etiqueta(widgets, etiqueta):
+    # Por etiqueta y no por posición: otras secciones de la app también tienen campos
+    return next(w for w in widgets if w.label == etiqueta)
+
+
+def sesion(at):
+    # (paso, acción) en el orden en que los haría un usuario
+    yield "carga inicial", lambda: None
+    yield "monto", lambda: por_etiqueta(at.number_input, "Monto solicitado ($)").set_value(1_000_000.0)
+    yield "cuotas", lambda: por_etiqueta(at.number_input, "Cantidad de cuotas").set_value(12)
+    yield "tasa", lambda: por_etiqueta(at.number_input, "Tasa anual (%)").set_value(48.0)
+    for etiqueta, texto in (("Nombre completo", "Juan Pérez"), ("Área", "Administración"), ("Sector", "Tesorería"),
+                            ("Puesto", "Analista")):
+        yield "panel lateral", lambda e=etiqueta, t=texto: por_etiqueta(at.sidebar.text_input, e).set_value(t)
+    yield "simular", lambda: at.button(key="simular_button").click()
+    yield "panel lateral", lambda: por_etiqueta(at.sidebar.text_area, "Motivo de la solicitud").set_value(
+        "será destinado a gastos de viaje")
+    yield "panel lateral", lambda: por_etiqueta(at.sidebar.text_input, "Puesto").set_value("Analista Sr.")
+    yield "generar nota", lambda: at.button(key="generar_nota_button").click()
+    yield "panel lateral", lambda: por_etiqueta(at.sidebar.text_input, "Sector").set_value("Tesorería General")
+
+
+# Lo que debe haber en session_state después de cada paso, para que se mida lo que dice su nombre
+VERIFICACIONES = {
+    "simular": lambda estado: estado["simulacion_realizada"],
+    "generar nota": lambda estado: "nota_docx" in estado and bool(estado["nota_docx"]),
+}
+
+
+def medir_sesion(con_cache):
+    st.cache_data.clear()
+    at = AppTest.from_file("app.py", default_timeout=120)
+    at.session_state["bruto"] = 1_650_000.0
+    at.session_state["neto"] = 1_419_000.0
+    tiempos = {}
+    for paso, accion in sesion(at):
+        accion()
+        if not con_cache:
+            st.cache_data.clear()
+        inicio = time.perf_counter()
+        at.run()
+        tiempos.setdefault(paso, []).append(time.perf_counter() - inicio)
+        assert not at.exception, at.exception
+        verificar = VERIFICACIONES.get(paso)
+        assert verificar is None or verificar(at.session_state), (paso, [e.value for e in at.error])
+    return tiempos
+
+
+def main(repeticiones=3):
+    # Antes de que app.py importe auditoria. Se borra al salir, después de que
+    # la auditoría (registrada más tarde en atexit) escriba lo pendiente
+    carpeta = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, carpeta, ignore_errors=True)
+    os.environ["SIMULADOR_AUDITORIA"] = os.path.join(carpeta, "auditoria.db")
+    # Fuera de un servidor de Streamlit, cada st.cache_data.clear() emite un aviso
+    logging.getLogger("streamlit.runtime.caching").setLevel(logging.ERROR)
+    medir_sesion(True)  # Primera ejecución: importaciones y compilación del script
+    resultados = {False: {}, True: {}}
+    # Alternadas, para que ambas variantes se midan en las mismas condiciones
+    for _ in range(repeticiones):
+        for con_cache in (False, True):
+            for paso, tiempos in medir_sesion(con_cache).items():
+                resultados[con_cache].setdefault(paso, []).extend(tiempos)
+
+    print(f"{'paso':15s} {'sin caché':>12s} {'con caché':>12s}   (mediana por recarga)")
+    for paso in resultados[False]:
+        sin, con = (statistics.median(resultados[c][paso]) for c in (False, True))
+        print(f"{paso:15s} {sin * 1000:9.1f} ms {con * 1000:9.1f} ms")
+    totales = [sum(sum(t) for t in resultados[c].values()) / repeticiones for c in (False, True)]
+    print(f"{'sesión completa':15s} {totales[0] * 1000:9.1f} ms {totales[1] * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
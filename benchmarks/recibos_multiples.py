@@ -0,0 +1,69 @@
+"""
+Lectura de varios recibos (uno por mes) como en app.py: un recibo, los
+mismos recibos uno tras otro y en paralelo con un pool de procesos ya
+iniciado. Verifica que ambas lecturas coincidan y que el bruto y el neto
+combinados de elegibilidad coincidan con statistics.
+
+Uso: python -m benchmarks.recibos_multiples [recibos] [repeticiones]
+"""
+
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.recibos_sinteticos import generar_recibo
+from elegibilidad import CRITERIOS_BASE, calcular_base_sueldos
+from lote_recibos import procesos_disponibles
+from recibos import parsear_recibo, parsear_recibos
+
+ESPERADO = {
+    "promedio": statistics.fmean,
+    "minimo": min,
+    "mediana": statistics.median,
+}
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(cantidad=6, repeticiones=10):
+    rng = random.Random(0)
+    recibos = [generar_recibo(rng) for _ in range(cantidad)]
+    contenidos = [pdf for pdf, _ in recibos]
+    procesos = procesos_disponibles()
+
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        # Los procesos se inician y cargan MuPDF antes de medir, como el pool compartido de la app
+        paralelo = parsear_recibos(contenidos, executor=pool)
+        secuencial = parsear_recibos(contenidos)
+        assert paralelo == secuencial
+        for recibo, (_, esperado) in zip(secuencial, recibos):
+            assert (recibo.bruto, recibo.neto) == (esperado["bruto"], esperado["neto"]), (recibo, esperado)
+
+        # El caché de recibos.py no interviene: parsear_recibo lee siempre el PDF
+        print(f"{os.cpu_count()} CPU, {procesos} procesos")
+        print(f"1 recibo              {medir(lambda: parsear_recibo(contenidos[0]), repeticiones):7.1f} ms")
+        print(f"{cantidad} recibos secuencial  {medir(lambda: parsear_recibos(contenidos), repeticiones):7.1f} ms")
+        print(f"{cantidad} recibos en paralelo "
+              f"{medir(lambda: parsear_recibos(contenidos, executor=pool), repeticiones):7.1f} ms")
+
+    for criterio in CRITERIOS_BASE:
+        bruto, neto = calcular_base_sueldos(secuencial, criterio)
+        combinar = ESPERADO[criterio]
+        assert bruto == round(combinar([e["bruto"] for _, e in recibos]), 2), criterio
+        assert neto == round(combinar([e["neto"] for _, e in recibos]), 2), criterio
+        print(f"{criterio:9s} bruto ${bruto:>14,.2f}   neto ${neto:>14,.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,152 @@
+"""
+Generación de recibos de sueldo sintéticos en PDF para benchmarks y
+verificaciones locales. Cada recibo se devuelve junto con los valores
+esperados, de modo que los resultados del parser se puedan comparar.
+
+Además del recibo básico (una página, montos entre 10.000 y 1.500.000) hay
+variantes: nombres compuestos y otros datos junto al bloque "Apellido y
+Nombre:", montos de distintas magnitudes, cantidades con decimales,
+conceptos que no están en resources.py y tablas que siguen en varias
+páginas.
+"""
+
+import random
+
+import fitz  # pymupdf
+
+from resources import CODIGOS_BRUTO, CODIGOS_DEDUCCIONES
+
+APELLIDOS = ["GOMEZ", "FERNANDEZ", "LOPEZ", "MARTINEZ", "RODRIGUEZ", "PEREZ", "GARCIA", "SOSA"]
+NOMBRES = ["JUAN", "MARIA", "LUCIA", "CARLOS", "ANA", "JORGE", "SOFIA", "PABLO"]
+APELLIDOS_COMPUESTOS = ["DE LA FUENTE", "DEL VALLE", "SAN MARTIN", "GOMEZ PAZ"]
+NOMBRES_COMPUESTOS = ["MARIA JOSE", "JUAN PABLO", "ANA LAURA", "LUIS ALBERTO"]
+CATEGORIAS = ["Administrativo, 1ra", "Técnico, 2da", "Operario"]
+
+# Conceptos con códigos que no están en resources.py: no deben sumarse
+CONCEPTOS_AJENOS = [("9100", "Reintegro de gastos"), ("9500", "Embargo judicial"), ("612", "Anticipo vacaciones")]
+
+# Rangos de montos en las variantes: sin separador de miles, con uno y con dos
+RANGOS_MONTO = [(100, 999.99), (1_000, 999_999.99), (1_000_000, 2_500_000)]
+RANGO_BASICO = (1_000_000, 3_000_000)
+# Las deducciones suman menos que el básico: el neto nunca es negativo
+RANGOS_DEDUCCION = [(100, 999.99), (1_000, 150_000)]
+
+TAMANO_FUENTE = 8
+ALTO_FILA = 15
+
+# Posición x de cada columna de la tabla de conceptos
+COLUMNAS = {"codigo": 40, "cantidad": 300, "remunerativo": 380, "deduccion": 480}
+
+
+def formatear_monto(valor):
+    # 1234567.8 -> "1.234.567,80"
+    return f"{valor:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def generar_filas(rng, variantes):
+    # (código, concepto, cantidad, monto, tipo); tipo None para los conceptos ajenos
+    filas = []
+    for codigo in CODIGOS_BRUTO:
+        if codigo == "20" or rng.random() < 0.6:
+            if not variantes:
+                cantidad = formatear_monto(rng.randint(1, 30)) if rng.random() < 0.5 else None
+                valor = round(rng.uniform(50_000, 1_500_000), 2)
+            else:
+                # Cantidades con decimales (horas, días) y montos de distintas magnitudes
+                cantidad = formatear_monto(rng.randint(1, 200_000) / 100) if rng.random() < 0.5 else None
+                valor = round(rng.uniform(*(RANGO_BASICO if codigo == "20" else rng.choice(RANGOS_MONTO))), 2)
+            filas.append((codigo, CODIGOS_BRUTO[codigo]["concepto"], cantidad, valor, "REM"))
+    for codigo in CODIGOS_DEDUCCIONES:
+        if not variantes:
+            cantidad = formatear_monto(rng.randint(1, 15)) if rng.random() < 0.5 else None
+            valor = round(rng.uniform(10_000, 200_000), 2)
+        else:
+            cantidad = formatear_monto(rng.randint(1, 2_000) / 100) if rng.random() < 0.5 else None
+            valor = round(rng.uniform(*rng.choice(RANGOS_DEDUCCION)), 2)
+        filas.append((codigo, CODIGOS_DEDUCCIONES[codigo]["concepto"], cantidad, valor, "DED"))
+
+    if variantes:
+        for codigo, concepto in rng.sample(CONCEPTOS_AJENOS, rng.randint(1, 2)):
+            filas.insert(rng.randint(0, len(filas)), (codigo, concepto, None, round(rng.uniform(1_000, 99_999), 2),
+                                                      None))
+    return filas
+
+
+def escribir_encabezado(page, apellido, nombre, legajo, categoria):
+    page.insert_text((40, 60), "Apellido y Nombre:", fontsize=TAMANO_FUENTE)
+    if legajo is not None:
+        # Otros datos del empleado antes del nombre; la categoría lleva una coma
+        page.insert_text((300, 60), f"Legajo: {legajo}", fontsize=TAMANO_FUENTE)
+        page.insert_text((300, 75), f"Categoria: {categoria}", fontsize=TAMANO_FUENTE)
+    page.insert_text((40, 75), f"{apellido}, {nombre}", fontsize=TAMANO_FUENTE)
+
+
+def escribir_titulos(page, columnas, y):
+    for titulo, x in [("Codigo", columnas["codigo"]), ("Concepto", columnas["codigo"] + 50),
+                      ("Cantidad", columnas["cantidad"]), ("Remunerativo", columnas["remunerativo"]),
+                      ("Deducciones", columnas["deduccion"])]:
+        page.insert_text((x, y), titulo, fontsize=TAMANO_FUENTE)
+
+
+def generar_recibo(rng=None, columnas=None, etiqueta_totales=True, variantes=False, filas_por_pagina=None,
+                   repetir_encabezado=False):
+    """Devuelve (bytes del PDF, valores esperados) para un empleado aleatorio.
+
+    Con `variantes`, nombres compuestos, legajo y categoría junto al nombre,
+    montos de distintas magnitudes, cantidades con decimales y conceptos
+    ajenos a resources.py. Con `filas_por_pagina`, la tabla sigue en una
+    página nueva cada esa cantidad de filas; si `repetir_encabezado`, cada
+    página repite el nombre y los títulos de la tabla.
+    """
+    rng = rng or random.Random()
+    columnas = columnas or COLUMNAS
+    if variantes:
+        apellido = rng.choice(APELLIDOS + APELLIDOS_COMPUESTOS)
+        nombre = rng.choice(NOMBRES + NOMBRES_COMPUESTOS)
+        legajo, categoria = rng.randint(1, 99_999), rng.choice(CATEGORIAS)
+    else:
+        apellido, nombre = rng.choice(APELLIDOS), rng.choice(NOMBRES)
+        legajo = categoria = None
+
+    filas = generar_filas(rng, variantes)
+    bruto = round(sum(v for *_, v, t in filas if t == "REM"), 2)
+    deducciones = round(sum(v for *_, v, t in filas if t == "DED"), 2)
+    esperado = {
+        "nombre": f"{nombre} {apellido}",
+        "bruto": bruto,
+        "deducciones": deducciones,
+        "neto": round(bruto - deducciones, 2),
+        "detectados": [(c, v, t) for c, _, _, v, t in filas if t is not None],
+    }
+
+    doc = fitz.open()
+    page = doc.new_page()
+    escribir_encabezado(page, apellido, nombre, legajo, categoria)
+    y = 120
+    escribir_titulos(page, columnas, y)
+    for i, (codigo, concepto, cantidad, valor, tipo) in enumerate(filas):
+        if filas_por_pagina and i and i % filas_por_pagina == 0:
+            page = doc.new_page()
+            y = 60
+            if repetir_encabezado:
+                escribir_encabezado(page, apellido, nombre, legajo, categoria)
+                y = 120
+                escribir_titulos(page, columnas, y)
+        y += ALTO_FILA
+        page.insert_text((columnas["codigo"], y), f"{codigo} {concepto}", fontsize=TAMANO_FUENTE)
+        if cantidad:
+            page.insert_text((columnas["cantidad"], y), cantidad, fontsize=TAMANO_FUENTE)
+        columna = "deduccion" if tipo == "DED" else "remunerativo"
+        page.insert_text((columnas[columna], y), formatear_monto(valor), fontsize=TAMANO_FUENTE)
+    y += 30
+    if etiqueta_totales:
+        page.insert_text((columnas["codigo"], y), "Totales", fontsize=TAMANO_FUENTE)
+    page.insert_text((columnas["remunerativo"], y), formatear_monto(bruto), fontsize=TAMANO_FUENTE)
+    page.insert_text((columnas["deduccion"], y), formatear_monto(deducciones), fontsize=TAMANO_FUENTE)
+    page.insert_text((columnas["deduccion"], y + ALTO_FILA), formatear_monto(esperado["neto"]),
+                     fontsize=TAMANO_FUENTE)
+
+    esperado["paginas"] = doc.page_count
+    contenido = doc.tobytes()
+    doc.close()
+    return contenido, esperado
@@ -0,0 +1,239 @@
+"""
+Suite de punta a punta sobre recibos sintéticos: velocidad, memoria y
+exactitud de la lectura de recibos (leer_lineas, extraer_sueldos,
+calcular_bloques_forzado y parsear_recibo en ambos modos), del cuadro de
+amortización y de la generación de la nota.
+
+Cada etapa informa operaciones por segundo, p50, el pico de memoria
+asignada desde Python por operación (tracemalloc, en una pasada aparte),
+el crecimiento del RSS (incluye la memoria de MuPDF) y cuántos resultados
+coinciden con los valores generados.
+
+Cada etapa se mide --repeticiones veces y se informa la pasada con menor
+p50. Aun así, en máquinas virtuales compartidas el p50 varía bastante de
+una corrida a otra: las comparaciones con --base conviene hacerlas en la
+misma máquina, sin otras cargas, y con la tolerancia acorde.
+
+Termina con error si algún resultado exigido no coincide o, con --base, si
+el p50 de alguna etapa supera al de la base más allá de la tolerancia.
+
+Uso:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --recibos 100 -o resultados.json
+    python -m benchmarks.suite --base resultados.json --tolerancia 0.2
+"""
+
+import argparse
+import io
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+from typing import NamedTuple, Optional
+
+import numpy as np
+from docx import Document
+
+from amortizacion import generar_cuadro_amortizacion
+from benchmarks.amortizacion_vectorizada import cuadro_original
+from benchmarks.concurrencia_recibos import rss_mb
+from benchmarks.paridad_modos import COLUMNAS_REORDENADAS, coincide
+from benchmarks.recibos_sinteticos import generar_recibo
+from notas import generar_nota
+from recibos import calcular_bloques_forzado, extraer_sueldos, leer_lineas, parsear_recibo
+
+# Escenario: (argumentos de generar_recibo, si las etapas de modo texto deben acertar en todos)
+ESCENARIOS = {
+    "básico": ({}, True),
+    "variantes": ({"variantes": True}, True),
+    "columnas reordenadas": ({"columnas": COLUMNAS_REORDENADAS, "variantes": True}, True),
+    "varias páginas": ({"variantes": True, "filas_por_pagina": 5}, True),
+    "varias páginas con encabezado": ({"variantes": True, "filas_por_pagina": 5, "repetir_encabezado": True}, True),
+    # Sin "Totales" el modo texto puede tomar un total como cantidad y monto de un concepto
+    "sin etiqueta Totales": ({"etiqueta_totales": False}, False),
+}
+
+# Operaciones por etapa medidas con tracemalloc, que hace todo más lento
+MUESTRA_MEMORIA = 20
+# Pasadas por etapa; se informa la más rápida, la menos afectada por otros procesos
+REPETICIONES = 3
+
+
+class Resultado(NamedTuple):
+    etapa: str
+    escenario: str
+    operaciones: int
+    por_segundo: float
+    p50_ms: float
+    pico_kib: float
+    rss_mb: float
+    correctos: Optional[int]
+    exigido: bool
+
+
+def medir(etapa, escenario, funcion, entradas, verificar=None, exigido=True, repeticiones=REPETICIONES):
+    rss_inicial = rss_mb()
+    pasadas = []
+    for _ in range(repeticiones):
+        tiempos, salidas = [], []
+        for entrada in entradas:
+            inicio = time.perf_counter()
+            salidas.append(funcion(entrada))
+            tiempos.append(time.perf_counter() - inicio)
+        pasadas.append(tiempos)
+    crecimiento = rss_mb() - rss_inicial
+    tiempos = min(pasadas, key=statistics.median)
+
+    tracemalloc.start()
+    pico = 0
+    for entrada in entradas[:MUESTRA_MEMORIA]:
+        tracemalloc.reset_peak()
+        funcion(entrada)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    # verificar(i, salida) compara la salida de entradas[i] con el valor esperado
+    correctos = None if verificar is None else sum(verificar(i, s) for i, s in enumerate(salidas))
+    return Resultado(etapa, escenario, len(entradas), len(entradas) / sum(tiempos),
+                     statistics.median(tiempos) * 1000, pico / 1024, crecimiento, correctos, exigido)
+
+
+def etapas_recibos(escenario, argumentos, texto_exacto, cantidad, rng, repeticiones=REPETICIONES):
+    recibos = [generar_recibo(rng, **argumentos) for _ in range(cantidad)]
+    pdfs = [pdf for pdf, _ in recibos]
+    esperados = [esperado for _, esperado in recibos]
+    lineas = [leer_lineas(pdf) for pdf in pdfs]
+
+    def sueldos(lines):
+        try:
+            return extraer_sueldos(lines)
+        except ValueError:
+            return None
+
+    def sueldos_correctos(i, salida):
+        e = esperados[i]
+        return salida == (e["bruto"], e["neto"], e["nombre"])
+
+    def bloques_correctos(i, salida):
+        e = esperados[i]
+        return (salida[:3] == (e["bruto"], e["deducciones"], e["neto"])
+                and [d[:3] for d in salida[3]] == e["detectados"])
+
+    return [
+        medir("leer_lineas", escenario, leer_lineas, pdfs, repeticiones=repeticiones),
+        medir("extraer_sueldos", escenario, sueldos, lineas, sueldos_correctos, texto_exacto, repeticiones),
+        medir("calcular_bloques_forzado", escenario, calcular_bloques_forzado, lineas, bloques_correctos,
+              texto_exacto, repeticiones),
+        medir("parsear_recibo layout", escenario, lambda pdf: parsear_recibo(pdf, "layout"), pdfs,
+              lambda i, r: coincide(r, esperados[i]), repeticiones=repeticiones),
+        medir("parsear_recibo texto", escenario, lambda pdf: parsear_recibo(pdf, "texto"), pdfs,
+              lambda i, r: coincide(r, esperados[i]), texto_exacto, repeticiones),
+    ]
+
+
+def etapa_cuadro(cantidad, rng, repeticiones=REPETICIONES):
+    prestamos = [(round(rng.uniform(10_000, 5_000_000), 2), rng.randint(1, 18),
+                  0.0 if rng.random() < 0.05 else round(rng.uniform(0, 150), 1)) for _ in range(cantidad)]
+    return medir("generar_cuadro_amortizacion", "-", lambda p: generar_cuadro_amortizacion(*p), prestamos,
+                 lambda i, cuadro: np.array_equal(cuadro.to_numpy(), cuadro_original(*prestamos[i]).to_numpy()),
+                 repeticiones=repeticiones)
+
+
+def etapa_nota(cantidad, rng, repeticiones=REPETICIONES):
+    solicitudes = []
+    for i in range(cantidad):
+        _, esperado = generar_recibo(rng, variantes=True)
+        monto = round(rng.uniform(10_000, 1_000_000), 2)
+        cuotas = rng.randint(1, 18)
+        solicitudes.append(dict(
+            monto=monto, cuotas=cuotas, tasa_final=48.0, cuota=monto / cuotas, fecha=date(2026, 10, 17),
+            nombre=esperado["nombre"], area="Administración", sector="Tesorería", motivo="Vacaciones",
+            motivo_detallado="será destinado a gastos de viaje", puesto="Analista", neto=esperado["neto"],
+        ))
+
+    def nota_correcta(i, nota):
+        datos = solicitudes[i]
+        doc = Document(io.BytesIO(nota.getvalue()))
+        texto = "\n".join([p.text for p in doc.paragraphs]
+                          + [c.text for t in doc.tables for r in t.rows for c in r.cells])
+        # El cuadro es la última tabla: encabezado y una fila por cuota
+        return (datos["nombre"] in texto and f"${datos['monto']:,.2f}" in texto and "<" not in texto
+                and len(doc.tables[-1].rows) == datos["cuotas"] + 1)
+
+    return medir("generar_nota", "-", lambda datos: generar_nota(**datos), solicitudes, nota_correcta,
+                 repeticiones=repeticiones)
+
+
+def comparar(resultados, base, tolerancia):
+    # Se compara el p50, menos sensible que el promedio a pausas aisladas
+    anteriores = {(r["etapa"], r["escenario"]): r["p50_ms"] for r in base}
+    regresiones = []
+    for r in resultados:
+        anterior = anteriores.get((r.etapa, r.escenario))
+        if anterior:
+            cambio = r.p50_ms / anterior - 1
+            print(f"{r.etapa:28s} {r.escenario:30s} {cambio:+7.1%}")
+            if cambio > tolerancia:
+                regresiones.append(r)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de rendimiento y exactitud sobre recibos sintéticos.")
+    parser.add_argument("--recibos", type=int, default=200, help="Recibos por escenario")
+    parser.add_argument("--cuadros", type=int, default=2000, help="Cuadros de amortización")
+    parser.add_argument("--notas", type=int, default=50, help="Notas generadas")
+    parser.add_argument("-o", "--salida", default=None, help="Archivo .json donde guardar los resultados")
+    parser.add_argument("--base", default=None, help="Resultados anteriores (.json) con los que comparar")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES,
+                        help="Pasadas por etapa; se informa la más rápida")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Aumento del p50 admitido respecto de la base (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+    if args.repeticiones < 1:
+        parser.error("--repeticiones debe ser al menos 1")
+
+    rng = random.Random(0)
+    # Calentamiento: MuPDF, python-docx y la plantilla de la nota se cargan antes de medir
+    etapas_recibos("calentamiento", {}, True, 5, random.Random(1), 1)
+    etapa_nota(2, random.Random(1), 1)
+
+    resultados = []
+    for escenario, (argumentos, texto_exacto) in ESCENARIOS.items():
+        resultados += etapas_recibos(escenario, argumentos, texto_exacto, args.recibos, rng, args.repeticiones)
+    resultados += [etapa_cuadro(args.cuadros, rng, args.repeticiones),
+                   etapa_nota(args.notas, rng, args.repeticiones)]
+
+    print(f"{'etapa':28s} {'escenario':30s} {'op/s':>9s} {'p50 ms':>8s} {'pico KiB':>9s} {'RSS MB':>7s}  correctos")
+    fallidos = []
+    for r in resultados:
+        exactitud = "-" if r.correctos is None else f"{r.correctos}/{r.operaciones}"
+        if r.correctos is not None and r.correctos < r.operaciones:
+            exactitud += " (exigido)" if r.exigido else " (informativo)"
+            if r.exigido:
+                fallidos.append(r)
+        print(f"{r.etapa:28s} {r.escenario:30s} {r.por_segundo:9.1f} {r.p50_ms:8.2f} {r.pico_kib:9.1f} "
+              f"{r.rss_mb:+7.1f}  {exactitud}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump([r._asdict() for r in resultados], archivo, ensure_ascii=False, indent=1)
+
+    regresiones = []
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            print(f"\nCambio del p50 respecto de {args.base}:")
+            regresiones = comparar(resultados, json.load(archivo), args.tolerancia)
+
+    for r in fallidos:
+        print(f"❌ {r.etapa} ({r.escenario}): {r.correctos}/{r.operaciones} correctos", file=sys.stderr)
+    for r in regresiones:
+        print(f"❌ {r.etapa} ({r.escenario}): más lento que la base", file=sys.stderr)
+    return 1 if fallidos or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
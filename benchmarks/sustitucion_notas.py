@@ -0,0 +1,99 @@
+"""
+Reemplazo de marcadores en plantillas grandes: el reemplazo anterior (un
+recorrido por marcador, con texto del párrafo reescrito si el marcador está
+partido en runs) contra sustituir_marcadores de notas.py, que recorre cada
+párrafo una vez.
+
+También verifica que se conserve el formato: cada run mantiene su negrita y
+cursiva, el valor queda en el run donde empieza el marcador y el texto final
+es el esperado.
+
+Uso: python -m benchmarks.sustitucion_notas [parrafos] [celdas]
+"""
+
+import io
+import sys
+import time
+
+from docx import Document
+
+from benchmarks.latencia_notas import reemplazar_en_parrafo
+from notas import sustituir_marcadores
+
+DATOS = {
+    "<nombre>": "Juan Pérez", "<area>": "Administración", "<sector>": "Tesorería",
+    "<fecha>": "16 de mayo del 2025", "<fecha_directorio>": "20 de junio del 2025",
+    "<monto>": "$1,500,000.00", "<cuotas>": "12", "<motivo>": "Vacaciones",
+    "<motivo_detallado>": "será destinado a gastos de viaje", "<monto_en_letras>": "Un millón quinientos mil pesos",
+    "<tasa>": "48.00%", "<vencimiento>": "30 de mayo del 2025", "<puesto>": "Analista",
+    "<neto_menos_cuota>": "$1,250,000.00",
+}
+
+# Runs de cada párrafo: (texto, negrita, cursiva); incluye marcadores partidos
+RUNS = [
+    ("Sr./Sra. ", False, False), ("<nom", True, False), ("bre>", False, True),
+    (" del área <area>, sector ", False, False), ("<", False, False), ("sector", True, True),
+    (">. Monto: <monto> en <cuotas> cuotas, texto sin marcadores.", False, False),
+]
+TEXTO_ESPERADO = "".join(t for t, _, _ in RUNS)
+for _marcador, _valor in DATOS.items():
+    TEXTO_ESPERADO = TEXTO_ESPERADO.replace(_marcador, _valor)
+
+
+def plantilla(parrafos, celdas):
+    doc = Document()
+    for _ in range(parrafos):
+        p = doc.add_paragraph()
+        for texto, negrita, cursiva in RUNS:
+            run = p.add_run(texto)
+            run.bold, run.italic = negrita, cursiva
+        doc.add_paragraph("Párrafo sin marcadores de relleno para la plantilla.")
+    tabla = doc.add_table(rows=celdas, cols=2)
+    for fila in tabla.rows:
+        fila.cells[0].text = "Tasa nominal anual"
+        fila.cells[1].text = "<tasa> "
+    contenido = io.BytesIO()
+    doc.save(contenido)
+    return contenido.getvalue()
+
+
+def parrafos_con_marcadores(doc):
+    parrafos = [p for p in doc.paragraphs if "<" in p.text]
+    parrafos += [p for t in doc.tables for r in t.rows for c in r.cells[1:] for p in c.paragraphs]
+    return parrafos
+
+
+def verificar_formato(doc):
+    for p in doc.paragraphs:
+        if not p.runs or p.runs[0].text != "Sr./Sra. ":
+            continue
+        assert p.text == TEXTO_ESPERADO, p.text
+        assert [(r.bold, r.italic) for r in p.runs] == [(n, c) for _, n, c in RUNS]
+        # El valor de un marcador partido queda en el run donde empieza
+        assert p.runs[1].text == DATOS["<nombre>"] and p.runs[2].text == ""
+        assert p.runs[4].text == DATOS["<sector>"] and p.runs[5].text == ""
+    for t in doc.tables:
+        for r in t.rows:
+            assert r.cells[1].text == DATOS["<tasa>"] + " "
+
+
+def main(parrafos=2000, celdas=500):
+    contenido = plantilla(parrafos, celdas)
+
+    resultados = {}
+    for nombre, funcion in (("anterior", reemplazar_en_parrafo), ("una pasada", sustituir_marcadores)):
+        doc = Document(io.BytesIO(contenido))
+        objetivo = parrafos_con_marcadores(doc)
+        inicio = time.perf_counter()
+        for p in objetivo:
+            funcion(p, DATOS)
+        resultados[nombre] = time.perf_counter() - inicio
+        if nombre == "una pasada":
+            verificar_formato(doc)
+    print(f"{parrafos} párrafos con marcadores, {celdas} celdas: formato conservado")
+    for nombre, segundos in resultados.items():
+        print(f"  {nombre:10s} {segundos * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
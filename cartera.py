@@ -0,0 +1,166 @@
+"""
+Proyección de los flujos de fondos de toda la cartera de adelantos.
+
+A partir de una tabla de préstamos (monto, cuotas, tasa anual y fecha de
+solicitud) suma mes a mes lo que se cobra en cuotas, su división en interés
+y amortización, y el capital pendiente de todos los préstamos. La primera
+cuota vence el último día hábil del mes de la solicitud, como en la nota
+(notas.ultimo_dia_habil_del_mes), y cada una de las siguientes el último
+día hábil del mes posterior.
+
+Los cronogramas se calculan con amortizacion.calcular_cronogramas para
+bloques de préstamos a la vez y se acumulan por mes con np.bincount: no se
+arma un cuadro por préstamo. Cada escenario suma puntos porcentuales a la
+tasa de todos los préstamos.
+
+El CSV puede ser el mismo del lote de notas: solo se usan las columnas
+monto, cuotas, tasa (anual, %) y fecha (AAAA-MM-DD).
+
+Uso:
+    python cartera.py prestamos.csv -o flujos.csv
+    python cartera.py prestamos.csv -o flujos.csv --escenarios 0 5 -5 --desde 2026-11
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import calcular_cronogramas, redondear
+from notas import ultimo_dia_habil_del_mes
+
+COLUMNAS_CARTERA = ["monto", "cuotas", "tasa", "fecha"]
+COLUMNAS_FLUJO = [
+    "Escenario (pp)", "Mes", "Vencimiento", "Cuotas cobradas", "Cobro total ($)",
+    "Interés ($)", "Amortización ($)", "Saldo de capital ($)",
+]
+
+# Préstamos por bloque al calcular los cronogramas; la memoria usada no
+# depende del tamaño de la cartera
+PRESTAMOS_POR_BLOQUE = 50_000
+
+
+def leer_cartera(archivo):
+    """Préstamos de un CSV (ruta o archivo abierto); ValueError si faltan columnas o hay filas inválidas."""
+    datos = pd.read_csv(archivo, dtype=str, encoding="utf-8-sig")
+    faltantes = [c for c in COLUMNAS_CARTERA if c not in datos.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+    monto = pd.to_numeric(datos["monto"], errors="coerce")
+    cuotas = pd.to_numeric(datos["cuotas"], errors="coerce")
+    tasa = pd.to_numeric(datos["tasa"], errors="coerce")
+    fecha = pd.to_datetime(datos["fecha"].str.strip(), format="%Y-%m-%d", errors="coerce")
+
+    validas = (monto > 0) & (cuotas >= 1) & (cuotas % 1 == 0) & (tasa >= 0) & fecha.notna()
+    if not validas.all():
+        # Numeradas como en el manifiesto del lote de notas: 1 es la primera fila de datos
+        filas = np.flatnonzero(~validas.to_numpy()) + 1
+        listado = ", ".join(map(str, filas[:10])) + (", ..." if len(filas) > 10 else "")
+        raise ValueError(f"{len(filas)} filas inválidas (monto > 0, cuotas enteras ≥ 1, tasa ≥ 0 "
+                         f"y fecha AAAA-MM-DD): {listado}")
+
+    return pd.DataFrame({
+        "monto": monto.astype(float), "cuotas": cuotas.astype(np.int64),
+        "tasa": tasa.astype(float), "fecha": fecha,
+    })
+
+
+def acumular_por_mes(montos, cuotas, tasas, mes_inicial, meses):
+    """Cuotas cobradas, cobro, interés, amortización y saldo sumados por mes (filas de un array 5 x meses).
+
+    `mes_inicial` es el mes de la primera cuota de cada préstamo, contado
+    desde el primer mes de la proyección.
+    """
+    sumas = np.zeros((5, meses))
+    for inicio in range(0, len(montos), PRESTAMOS_POR_BLOQUE):
+        bloque = slice(inicio, inicio + PRESTAMOS_POR_BLOQUE)
+        cronograma = calcular_cronogramas(montos[bloque], cuotas[bloque], tasas[bloque])
+        # Las celdas posteriores a la última cuota de cada préstamo son NaN
+        vigentes = ~np.isnan(cronograma.cuota_total)
+        mes = (mes_inicial[bloque, None] + np.arange(vigentes.shape[1]))[vigentes]
+        sumas[0] += np.bincount(mes, minlength=meses)
+        valores = (cronograma.cuota_total, cronograma.interes, cronograma.amortizacion, cronograma.saldo)
+        for fila, valor in enumerate(valores, 1):
+            sumas[fila] += np.bincount(mes, weights=valor[vigentes], minlength=meses)
+    return sumas
+
+
+def proyectar_cartera(cartera, escenarios=(0.0,), desde=None):
+    """Flujos mensuales de la cartera (columnas COLUMNAS_FLUJO), uno tras otro para cada escenario.
+
+    Cada escenario son los puntos porcentuales que se suman a la tasa de
+    todos los préstamos (la tasa no baja de 0). `desde` (una fecha) deja
+    solo los meses a partir del suyo. El saldo de capital es el que queda
+    después de cobrar las cuotas del mes.
+    """
+    montos = cartera["monto"].to_numpy(dtype=float)
+    cuotas = cartera["cuotas"].to_numpy(dtype=np.int64)
+    tasas = cartera["tasa"].to_numpy(dtype=float)
+    fechas = cartera["fecha"]
+    # Meses contados desde el año 0: enero de 2026 es 2026 * 12
+    mes_inicial = (fechas.dt.year * 12 + fechas.dt.month - 1).to_numpy(dtype=np.int64)
+    if not len(mes_inicial):
+        return pd.DataFrame(columns=COLUMNAS_FLUJO)
+
+    primero = int(mes_inicial.min())
+    meses = int((mes_inicial + cuotas).max()) - primero
+    numeros = np.arange(primero, primero + meses)
+    mostrar = numeros >= desde.year * 12 + desde.month - 1 if desde else np.ones(meses, dtype=bool)
+    numeros = numeros[mostrar]
+    etiquetas = [f"{n // 12}-{n % 12 + 1:02d}" for n in numeros]
+    vencimientos = [ultimo_dia_habil_del_mes(date(n // 12, n % 12 + 1, 1)).date() for n in numeros]
+
+    tablas = []
+    for variacion in escenarios:
+        sumas = acumular_por_mes(montos, cuotas, np.maximum(tasas + variacion, 0), mes_inicial - primero, meses)
+        sumas = sumas[:, mostrar]
+        tablas.append(pd.DataFrame(dict(zip(COLUMNAS_FLUJO, [
+            np.full(len(numeros), float(variacion)), etiquetas, vencimientos, sumas[0].astype(np.int64),
+            *redondear(sumas[1:]),
+        ]))))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def mes(texto):
+    # Argumento "AAAA-MM" de la línea de comandos
+    try:
+        return date.fromisoformat(f"{texto}-01")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Mes inválido: {texto} (formato AAAA-MM)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proyecta los flujos mensuales de la cartera de adelantos.")
+    parser.add_argument("cartera", help="Archivo .csv con un préstamo por fila")
+    parser.add_argument("-o", "--salida", default="flujos.csv", help="Archivo .csv de salida")
+    parser.add_argument("--escenarios", type=float, nargs="+", default=[0.0],
+                        help="Puntos porcentuales a sumar a la tasa de cada préstamo, uno por escenario")
+    parser.add_argument("--desde", type=mes, default=None, help="Primer mes de la proyección (AAAA-MM)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.cartera):
+        parser.error(f"No existe el archivo {args.cartera}")
+    try:
+        cartera = leer_cartera(args.cartera)
+    except ValueError as e:
+        parser.error(str(e))
+
+    inicio = time.perf_counter()
+    flujos = proyectar_cartera(cartera, args.escenarios, args.desde)
+    segundos = time.perf_counter() - inicio
+    flujos.to_csv(args.salida, index=False)
+
+    for variacion, flujo in flujos.groupby("Escenario (pp)", sort=False):
+        print(f"{variacion:+.2f} pp: ${flujo['Cobro total ($)'].sum():,.2f} en cuotas "
+              f"(${flujo['Interés ($)'].sum():,.2f} de interés) en {len(flujo)} meses")
+    print(f"✅ {len(cartera)} préstamos, {len(args.escenarios)} escenarios en {segundos:.1f} s -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
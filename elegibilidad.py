@@ -0,0 +1,239 @@
+"""
+Montos máximos que un empleado puede solicitar según las reglas de
+REGLAS_ELEGIBILIDAD en resources.py (el tope máximo, el múltiplo del sueldo
+bruto y la proporción del sueldo neto que puede ocupar la cuota), y
+validación de un préstamo puntual con esas mismas reglas. Con varios
+recibos, el bruto y el neto que se usan son el promedio, el mínimo o la
+mediana de los de cada mes.
+
+evaluar_nomina aplica las reglas a toda una nómina (una fila por empleado)
+a la vez, con NumPy, y devuelve para cada empleado el monto máximo, la
+regla que lo limita y si es elegible.
+
+Uso:
+    python elegibilidad.py nomina.csv --tasa 48 -o elegibilidad.csv
+    python elegibilidad.py recibos.parquet --tasa 48 --cuotas 12 -o elegibilidad.csv
+
+La nómina (.csv o .parquet) necesita las columnas bruto y neto; sirve la
+salida de lote_recibos.py. Columnas opcionales: cuotas y tasa (por
+defecto, las de la línea de comandos) y monto, para validar un préstamo
+puntual de cada empleado. Las demás columnas se copian a la salida.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import calcular_cuota
+from resources import CRITERIO_BASE_SUELDO, CUOTAS_MAXIMAS, REGLAS_ELEGIBILIDAD
+
+LIMITES = np.array([regla["etiqueta"] for regla in REGLAS_ELEGIBILIDAD])
+SIN_DATOS = "Datos incompletos o inválidos"
+COLUMNAS_EVALUACION = ["Elegible", "Monto máximo ($)", "Cuota ($)", "Límite", "Regla incumplida"]
+
+# Formas de combinar los sueldos de varios recibos
+CRITERIOS_BASE = {
+    "promedio": statistics.fmean,
+    "minimo": min,
+    "mediana": statistics.median,
+}
+
+
+def calcular_base_sueldos(recibos, criterio=CRITERIO_BASE_SUELDO):
+    """(bruto, neto) para las reglas, combinando con `criterio` los recibos leídos sin error."""
+    if criterio not in CRITERIOS_BASE:
+        raise ValueError(f"Criterio desconocido: {criterio}")
+    validos = [r for r in recibos if r.bruto is not None and r.neto is not None]
+    if not validos:
+        raise ValueError("Ningún recibo tiene sueldo bruto y neto.")
+    combinar = CRITERIOS_BASE[criterio]
+    return round(combinar([r.bruto for r in validos]), 2), round(combinar([r.neto for r in validos]), 2)
+
+
+def valor_regla(regla, sueldos):
+    # Monto o cuota máxima que admite la regla; escalar o array según los sueldos
+    return regla["factor"] * (1.0 if regla["base"] is None else sueldos[regla["base"]])
+
+
+def excede_reglas(monto, cuotas, tasa_anual, sueldos):
+    # True donde el préstamo no cumple alguna regla, comparando como validar_prestamo
+    cuota = calcular_cuota(monto, cuotas, tasa_anual)
+    excede = np.zeros(np.shape(monto), dtype=bool)
+    for regla in REGLAS_ELEGIBILIDAD:
+        excede |= (cuota if regla["limita"] == "cuota" else monto) > valor_regla(regla, sueldos)
+    return excede
+
+
+def montos_maximos(sueldos, cuotas, tasa_anual):
+    """(monto máximo, cuota, índice de la regla que lo limita) con todas las reglas a la vez.
+
+    `sueldos` es {"bruto": ..., "neto": ...}; sus valores, `cuotas` y
+    `tasa_anual` pueden ser escalares o arrays que se combinan entre sí.
+    """
+    # La cuota es proporcional al monto: cuota = monto * cuota_por_peso
+    cuota_por_peso = calcular_cuota(1.0, cuotas, tasa_anual)
+    limites = np.column_stack(np.broadcast_arrays(*[
+        valor_regla(regla, sueldos) / (cuota_por_peso if regla["limita"] == "cuota" else 1.0)
+        for regla in REGLAS_ELEGIBILIDAD
+    ]))
+    regla = limites.argmin(axis=1)
+
+    # Redondear hacia abajo al centavo. Los límites se calculan con punto
+    # flotante: el centavo siguiente puede cumplir todas las reglas, o el propio
+    # no cumplir alguna (3 × 319793.35 es 959380.0499999999). Se decide con la
+    # misma comparación que validar_prestamo
+    centavos = np.maximum(np.floor(limites.min(axis=1) * 100), 0)
+    centavos[~excede_reglas((centavos + 1) / 100, cuotas, tasa_anual, sueldos)] += 1
+    while True:
+        excede = excede_reglas(centavos / 100, cuotas, tasa_anual, sueldos) & (centavos > 0)
+        if not excede.any():
+            break
+        centavos[excede] -= 1
+    monto = centavos / 100
+    cuota = calcular_cuota(monto, cuotas, tasa_anual)
+    return monto, cuota, regla
+
+
+def calcular_montos_maximos(bruto, neto, tasa_anual, cuotas_maximas=CUOTAS_MAXIMAS):
+    """Monto máximo, su cuota y la regla que lo limita para cada cantidad de cuotas."""
+    cuotas = np.arange(1, cuotas_maximas + 1)
+    monto, cuota, regla = montos_maximos({"bruto": bruto, "neto": neto}, cuotas, tasa_anual)
+    return pd.DataFrame({
+        "Cuotas": cuotas,
+        "Monto máximo ($)": monto,
+        "Cuota ($)": cuota,
+        "Límite": LIMITES[regla],
+    })
+
+
+def reglas_no_aplicadas(bruto=None, neto=None):
+    """Etiquetas de las reglas que validar_prestamo omite por no conocer el sueldo bruto o neto."""
+    sueldos = {"bruto": bruto, "neto": neto}
+    return [r["etiqueta"] for r in REGLAS_ELEGIBILIDAD if r["base"] is not None and sueldos[r["base"]] is None]
+
+
+def validar_prestamo(monto, cuotas, tasa_anual, bruto=None, neto=None):
+    """Cuota mensual del préstamo; ValueError con el motivo si no cumple las reglas.
+
+    Las reglas que dependen del sueldo bruto o neto se omiten si no se conoce.
+    """
+    if cuotas < 1 or cuotas > CUOTAS_MAXIMAS:
+        raise ValueError(f"La cantidad de cuotas debe ser entre 1 y {CUOTAS_MAXIMAS}.")
+    sueldos = {"bruto": bruto, "neto": neto}
+    cuota = None
+    for regla in REGLAS_ELEGIBILIDAD:
+        if regla["base"] is not None and sueldos[regla["base"]] is None:
+            continue
+        if regla["limita"] == "cuota":
+            cuota = calcular_cuota(monto, cuotas, tasa_anual) if cuota is None else cuota
+            valor = cuota
+        else:
+            valor = monto
+        if valor > valor_regla(regla, sueldos):
+            raise ValueError(regla["mensaje"])
+    return calcular_cuota(monto, cuotas, tasa_anual) if cuota is None else cuota
+
+
+def evaluar_nomina(nomina, tasa_anual, cuotas=CUOTAS_MAXIMAS):
+    """La nómina con las columnas de COLUMNAS_EVALUACION agregadas, una fila por empleado.
+
+    Para cada empleado: el monto máximo con `cuotas` cuotas a `tasa_anual`
+    (o las de sus columnas "cuotas" y "tasa") y la regla que lo limita. Si
+    la nómina tiene la columna "monto", "Elegible" indica si ese préstamo
+    cumple todas las reglas y "Regla incumplida" la primera que no cumple,
+    como validar_prestamo; si no, si puede pedir algún monto. Las filas sin
+    bruto o neto (o con cuotas o tasa inválidas) no son elegibles.
+    """
+    def columna(nombre, defecto):
+        if nombre not in nomina.columns:
+            return np.full(len(nomina), defecto, dtype=float)
+        return pd.to_numeric(nomina[nombre], errors="coerce").to_numpy(dtype=float)
+
+    sueldos = {"bruto": columna("bruto", np.nan), "neto": columna("neto", np.nan)}
+    cuotas = columna("cuotas", cuotas)
+    tasas = columna("tasa", tasa_anual)
+    validas = (~np.isnan(sueldos["bruto"]) & ~np.isnan(sueldos["neto"]) & ~np.isnan(tasas) & (tasas >= 0)
+               & (cuotas >= 1) & (cuotas <= CUOTAS_MAXIMAS) & (cuotas % 1 == 0))
+    # Los valores de las filas inválidas se reemplazan para no propagar NaN; se descartan al final
+    sueldos = {k: np.where(validas, v, 0.0) for k, v in sueldos.items()}
+    cuotas = np.where(validas, cuotas, 1).astype(np.int64)
+    tasas = np.where(validas, tasas, 0.0)
+
+    monto_maximo, cuota, regla = montos_maximos(sueldos, cuotas, tasas)
+    limite = np.where(validas, LIMITES[regla], SIN_DATOS)
+
+    if "monto" in nomina.columns:
+        monto = columna("monto", np.nan)
+        solicitudes_validas = validas & ~np.isnan(monto)
+        monto = np.where(solicitudes_validas, monto, 0.0)
+        cuota_solicitada = calcular_cuota(monto, cuotas, tasas)
+        # Índice de la primera regla que no se cumple (len(REGLAS_ELEGIBILIDAD) si ninguna)
+        incumplida = np.full(len(nomina), len(REGLAS_ELEGIBILIDAD))
+        for i, r in reversed(list(enumerate(REGLAS_ELEGIBILIDAD))):
+            valor = cuota_solicitada if r["limita"] == "cuota" else monto
+            incumplida[valor > valor_regla(r, sueldos)] = i
+        elegible = solicitudes_validas & (incumplida == len(REGLAS_ELEGIBILIDAD))
+        regla_incumplida = np.where(solicitudes_validas, np.append(LIMITES, "")[incumplida], SIN_DATOS)
+    else:
+        elegible = validas & (monto_maximo > 0)
+        regla_incumplida = np.where(validas, "", SIN_DATOS)
+
+    evaluacion = nomina.copy()
+    for nombre, valores in zip(COLUMNAS_EVALUACION, (
+        elegible, np.where(validas, monto_maximo, np.nan), np.where(validas, cuota, np.nan), limite,
+        regla_incumplida,
+    )):
+        evaluacion[nombre] = valores
+    return evaluacion
+
+
+def leer_nomina(ruta):
+    """DataFrame de una nómina .csv o .parquet; ValueError si falta bruto o neto."""
+    if ruta.lower().endswith(".parquet"):
+        nomina = pd.read_parquet(ruta)
+    else:
+        nomina = pd.read_csv(ruta, encoding="utf-8-sig")
+    faltantes = [c for c in ("bruto", "neto") if c not in nomina.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la nómina: {', '.join(faltantes)}")
+    return nomina
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalúa la elegibilidad de toda una nómina de empleados.")
+    parser.add_argument("nomina", help="Archivo .csv o .parquet con bruto y neto de cada empleado")
+    parser.add_argument("-o", "--salida", default="elegibilidad.csv", help="Archivo .csv o .parquet de salida")
+    parser.add_argument("--tasa", type=float, required=True, help="Tasa anual (%%) si la nómina no trae la columna tasa")
+    parser.add_argument("--cuotas", type=int, default=CUOTAS_MAXIMAS,
+                        help="Cantidad de cuotas si la nómina no trae la columna cuotas")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.nomina):
+        parser.error(f"No existe el archivo {args.nomina}")
+    try:
+        nomina = leer_nomina(args.nomina)
+    except ValueError as e:
+        parser.error(str(e))
+
+    inicio = time.perf_counter()
+    evaluacion = evaluar_nomina(nomina, args.tasa, args.cuotas)
+    segundos = time.perf_counter() - inicio
+    if args.salida.lower().endswith(".parquet"):
+        evaluacion.to_parquet(args.salida, index=False)
+    else:
+        evaluacion.to_csv(args.salida, index=False)
+
+    for limite, cantidad in evaluacion["Límite"].value_counts().items():
+        print(f"{limite:30s} {cantidad:8d}")
+    print(f"✅ {len(evaluacion)} empleados evaluados en {segundos:.2f} s, "
+          f"{int(evaluacion['Elegible'].sum())} elegibles -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
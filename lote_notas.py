@@ -0,0 +1,227 @@
+"""
+Generación de notas de solicitud por lotes.
+
+Lee un CSV con una solicitud por fila, genera las notas en paralelo con un
+proceso por núcleo disponible y escribe cada .docx en un .zip a medida que
+se obtiene. Solo se mantienen en memoria las notas en proceso, de modo que
+el consumo no depende del tamaño del lote. Al final del .zip se agrega
+manifiesto.csv con el resultado (ok/error) de cada fila y el SHA-256 de cada
+nota, y cada fila queda en el registro de auditoría (auditoria.py).
+
+Columnas del CSV: nombre, area, sector, puesto, motivo, motivo_detallado,
+monto, cuotas, tasa (anual, %), fecha (AAAA-MM-DD) y neto. Con la columna
+opcional bruto también se verifica el múltiplo del sueldo bruto; sin ella
+esa regla no se aplica.
+
+Uso:
+    python lote_notas.py solicitudes.csv -o notas.zip
+    python lote_notas.py solicitudes.csv -o notas.zip --procesos 4 --plantillas plantillas/
+    python lote_notas.py solicitudes.csv -o notas.zip --auditoria /datos/auditoria.db
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+from auditoria import RUTA_AUDITORIA, Auditoria
+from lote_recibos import procesos_disponibles
+from notas import generar_nota
+
+COLUMNAS_SOLICITUD = [
+    "nombre", "area", "sector", "puesto", "motivo", "motivo_detallado",
+    "monto", "cuotas", "tasa", "fecha", "neto",
+]
+COLUMNAS_MANIFIESTO = ["fila", "nombre", "archivo", "estado", "error", "sha256"]
+ARCHIVO_MANIFIESTO = "manifiesto.csv"
+
+# Notas pendientes por proceso; limita cuántas pueden estar en memoria a la vez
+NOTAS_EN_VUELO_POR_PROCESO = 2
+
+
+def nombre_archivo(numero, nombre):
+    # "0007_juan_perez.docx": sin acentos ni caracteres especiales
+    ascii_ = unicodedata.normalize("NFKD", nombre or "").encode("ascii", "ignore").decode()
+    base = re.sub(r"[^A-Za-z0-9]+", "_", ascii_).strip("_").lower() or "nota"
+    return f"{numero:04d}_{base}.docx"
+
+
+def leer_solicitudes(archivo):
+    """Lector de las filas de un CSV de texto abierto; ValueError si faltan columnas."""
+    lector = csv.DictReader(archivo)
+    faltantes = [c for c in COLUMNAS_SOLICITUD if c not in (lector.fieldnames or [])]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+    return lector
+
+
+def leer_numero(fila, campo):
+    """float de fila[campo]; ValueError si no es un número finito."""
+    valor = float(fila[campo])
+    if not math.isfinite(valor):
+        raise ValueError(f"El campo {campo} debe ser un número finito.")
+    return valor
+
+
+def leer_opcional(fila, campo):
+    """Como leer_numero, pero None si el campo falta o está vacío."""
+    return None if fila.get(campo) in (None, "") else leer_numero(fila, campo)
+
+
+def leer_prestamo(fila):
+    """(monto, cuotas, tasa) de la fila; ValueError si no son válidos, como en la app."""
+    monto = leer_numero(fila, "monto")
+    cuotas = leer_numero(fila, "cuotas")
+    tasa = leer_numero(fila, "tasa")
+    if monto <= 0:
+        raise ValueError("El monto debe ser positivo.")
+    if not cuotas.is_integer():
+        raise ValueError("La cantidad de cuotas debe ser un número entero.")
+    if tasa < 0:
+        raise ValueError("La tasa no puede ser negativa.")
+    return monto, int(cuotas), tasa
+
+
+def preparar_solicitud(fila):
+    """Argumentos de generar_nota para una fila; ValueError si la solicitud no es válida."""
+    # NumPy se importa recién al validar la primera solicitud: app.py importa
+    # este módulo en cada carga de la página
+    from elegibilidad import validar_prestamo
+
+    monto, cuotas, tasa = leer_prestamo(fila)
+    bruto = leer_opcional(fila, "bruto")
+    neto = leer_numero(fila, "neto")
+    fecha = date.fromisoformat(fila["fecha"].strip())
+
+    # Mismas validaciones que la simulación de app.py; sin el bruto se omite su regla
+    cuota = validar_prestamo(monto, cuotas, tasa, bruto, neto)
+
+    return dict(
+        monto=monto, cuotas=cuotas, tasa_final=tasa, cuota=cuota, fecha=fecha,
+        nombre=fila["nombre"], area=fila["area"], sector=fila["sector"], motivo=fila["motivo"],
+        motivo_detallado=fila["motivo_detallado"], puesto=fila["puesto"], neto=neto,
+    )
+
+
+def procesar_solicitud(tarea, directorio=None):
+    """(fila del manifiesto, bytes del .docx o None); los errores quedan en el manifiesto."""
+    numero, fila = tarea
+    registro = dict.fromkeys(COLUMNAS_MANIFIESTO)
+    registro["fila"] = numero
+    registro["nombre"] = fila.get("nombre")
+    try:
+        nota = generar_nota(**preparar_solicitud(fila), directorio=directorio)
+    except Exception as e:
+        registro["estado"], registro["error"] = "error", str(e)
+        return registro, None
+    registro["estado"] = "ok"
+    registro["archivo"] = nombre_archivo(numero, fila.get("nombre"))
+    registro["sha256"] = hashlib.sha256(nota.getvalue()).hexdigest()
+    return registro, nota.getvalue()
+
+
+def registrar_fila(auditoria, fila, registro, contenido):
+    # Un evento "nota" por fila del manifiesto, con los datos de la solicitud tal como vinieron
+    solicitud = {c: fila.get(c) for c in COLUMNAS_SOLICITUD + ["bruto"] if c != "nombre" and c in fila}
+    auditoria.registrar("nota", registro["nombre"], origen="lote", **solicitud, fila=registro["fila"],
+                        archivo=registro["archivo"], estado=registro["estado"], error=registro["error"],
+                        sha256=registro["sha256"], bytes=len(contenido) if contenido is not None else None)
+
+
+def en_orden_acotado(pool, funcion, tareas, en_vuelo):
+    # Como pool.map, pero sin enviar todas las tareas de entrada: a lo sumo
+    # `en_vuelo` resultados esperan a ser consumidos. Devuelve (tarea, resultado)
+    pendientes = deque()
+    for tarea in tareas:
+        pendientes.append((tarea, pool.submit(funcion, tarea)))
+        if len(pendientes) >= en_vuelo:
+            primera, futuro = pendientes.popleft()
+            yield primera, futuro.result()
+    while pendientes:
+        primera, futuro = pendientes.popleft()
+        yield primera, futuro.result()
+
+
+def generar_lote(solicitudes, salida, procesos=None, directorio=None, mp_context=None, auditoria=None):
+    """Escribe en `salida` (ruta o archivo binario) el .zip con las notas y el manifiesto.
+
+    Devuelve (filas del manifiesto, segundos). Con `auditoria` (una
+    auditoria.Auditoria), cada fila se registra como evento "nota" con el
+    SHA-256 del .docx, o el error si no se generó. Desde un proceso con varios
+    hilos (la app) conviene `mp_context` "forkserver": con fork, un proceso
+    hijo puede heredar tomado un lock de otro hilo y quedar bloqueado.
+    """
+    procesos = procesos or procesos_disponibles()
+    directorio = os.path.abspath(directorio or os.getcwd())
+    manifiesto = []
+
+    inicio = time.perf_counter()
+    # Los .docx ya están comprimidos: se guardan tal cual dentro del .zip
+    with zipfile.ZipFile(salida, "w", zipfile.ZIP_STORED) as zf, \
+            ProcessPoolExecutor(max_workers=procesos, mp_context=mp_context) as pool:
+        tareas = enumerate(solicitudes, 1)
+        resultados = en_orden_acotado(pool, partial(procesar_solicitud, directorio=directorio),
+                                      tareas, procesos * NOTAS_EN_VUELO_POR_PROCESO)
+        for (_, fila), (registro, contenido) in resultados:
+            if contenido is not None:
+                zf.writestr(registro["archivo"], contenido)
+            if auditoria is not None:
+                registrar_fila(auditoria, fila, registro, contenido)
+            manifiesto.append(registro)
+
+        texto = io.StringIO()
+        escritor = csv.DictWriter(texto, fieldnames=COLUMNAS_MANIFIESTO)
+        escritor.writeheader()
+        escritor.writerows(manifiesto)
+        zf.writestr(ARCHIVO_MANIFIESTO, texto.getvalue().encode("utf-8"), zipfile.ZIP_DEFLATED)
+    return manifiesto, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera las notas de solicitud de un lote de adelantos.")
+    parser.add_argument("solicitudes", help="Archivo .csv con una solicitud por fila")
+    parser.add_argument("-o", "--salida", default="notas.zip", help="Archivo .zip de salida")
+    parser.add_argument("-p", "--procesos", type=int, default=None,
+                        help="Cantidad de procesos (por defecto, uno por núcleo disponible)")
+    parser.add_argument("--plantillas", default=None,
+                        help="Carpeta donde buscar la plantilla de la nota (por defecto, la actual)")
+    parser.add_argument("--auditoria", default=RUTA_AUDITORIA,
+                        help="Archivo SQLite de auditoría donde se registra cada nota (por defecto, "
+                             "SIMULADOR_AUDITORIA o auditoria.db)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.solicitudes):
+        parser.error(f"No existe el archivo {args.solicitudes}")
+
+    with open(args.solicitudes, newline="", encoding="utf-8-sig") as archivo:
+        try:
+            solicitudes = leer_solicitudes(archivo)
+        except ValueError as e:
+            parser.error(str(e))
+        if "bruto" not in solicitudes.fieldnames:
+            print("⚠️ El CSV no tiene la columna bruto: no se verifica el múltiplo del sueldo bruto", file=sys.stderr)
+        manifiesto, segundos = generar_lote(solicitudes, args.salida, args.procesos, args.plantillas,
+                                            auditoria=Auditoria(args.auditoria))
+
+    errores = [r for r in manifiesto if r["estado"] == "error"]
+    for registro in errores:
+        print(f"⚠️ fila {registro['fila']} ({registro['nombre']}): {registro['error']}", file=sys.stderr)
+    velocidad = len(manifiesto) / segundos if segundos else 0.0
+    print(f"✅ {len(manifiesto)} solicitudes en {segundos:.1f} s ({velocidad:.1f} notas/s), "
+          f"{len(errores)} con error -> {args.salida}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Procesamiento por lotes de recibos de sueldo.
+
+Lee todos los PDF de un directorio o de un .zip, los procesa en paralelo con
+un proceso por núcleo disponible y escribe una fila por recibo (totales y
+desglose por código de CODIGOS_BRUTO/CODIGOS_DEDUCCIONES) en CSV o Parquet a
+medida que se obtienen los resultados.
+
+Uso:
+    python lote_recibos.py recibos/ -o liquidacion.csv
+    python lote_recibos.py recibos.zip -o liquidacion.parquet --procesos 8
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from recibos import MODO_EXTRACCION, MODOS_EXTRACCION, ReciboParseado, parsear_recibo
+from resources import CODIGOS_BRUTO, CODIGOS_DEDUCCIONES
+
+# Recibos por tarea enviada a cada proceso
+TAMANO_TAREA = 16
+# Filas por grupo al escribir Parquet
+TAMANO_GRUPO_PARQUET = 1000
+
+COLUMNAS_CODIGOS = {
+    codigo: f"{codigo}_{datos['clave']}"
+    for codigo, datos in {**CODIGOS_BRUTO, **CODIGOS_DEDUCCIONES}.items()
+}
+COLUMNAS_TEXTO = ["archivo", "nombre", "error"]
+COLUMNAS_MONTOS = ["bruto", "deducciones", "neto"] + list(COLUMNAS_CODIGOS.values())
+COLUMNAS = COLUMNAS_TEXTO[:2] + COLUMNAS_MONTOS + COLUMNAS_TEXTO[2:]
+
+
+def procesos_disponibles():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def listar_recibos(entrada):
+    # (zip o None, ruta) de cada PDF, en orden estable
+    if zipfile.is_zipfile(entrada):
+        with zipfile.ZipFile(entrada) as zf:
+            nombres = [n for n in zf.namelist() if n.lower().endswith(".pdf")]
+        return [(entrada, n) for n in sorted(nombres)]
+    rutas = []
+    for raiz, _, archivos in os.walk(entrada):
+        rutas += [os.path.join(raiz, a) for a in archivos if a.lower().endswith(".pdf")]
+    return [(None, r) for r in sorted(rutas)]
+
+
+# Zips abiertos en cada proceso, para no releer el índice del zip por cada recibo
+_zips_abiertos = {}
+
+
+def leer_contenido(zip_path, ruta):
+    if zip_path is None:
+        with open(ruta, "rb") as f:
+            return f.read()
+    if zip_path not in _zips_abiertos:
+        _zips_abiertos[zip_path] = zipfile.ZipFile(zip_path)
+    return _zips_abiertos[zip_path].read(ruta)
+
+
+def fila_recibo(archivo, recibo):
+    """Fila de salida para un recibo ya leído: totales y montos por código."""
+    fila = dict.fromkeys(COLUMNAS)
+    fila["archivo"] = archivo
+    fila["error"] = recibo.error
+    fila["nombre"] = recibo.nombre
+    fila["bruto"], fila["deducciones"], fila["neto"] = recibo.bruto, recibo.deducciones, recibo.neto
+    for codigo, valor, _, _ in recibo.detectados or []:
+        columna = COLUMNAS_CODIGOS[codigo]
+        fila[columna] = round((fila[columna] or 0.0) + valor, 2)
+    return fila
+
+
+def procesar_recibo(tarea, modo=MODO_EXTRACCION):
+    """Fila de salida para un recibo; los errores quedan en la columna "error"."""
+    zip_path, ruta = tarea
+    try:
+        recibo = parsear_recibo(leer_contenido(zip_path, ruta), modo)
+    except Exception as e:
+        recibo = ReciboParseado(None, None, None, None, None, f"Error al leer el archivo: {e}")
+    return fila_recibo(ruta, recibo)
+
+
+class EscritorCSV:
+    def __init__(self, salida):
+        self.archivo = open(salida, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.archivo, fieldnames=COLUMNAS)
+        self.writer.writeheader()
+
+    def escribir(self, fila):
+        self.writer.writerow(fila)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class EscritorParquet:
+    def __init__(self, salida):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("❌ Para escribir Parquet instale pyarrow (pip install pyarrow).")
+        self.pa = pa
+        self.schema = pa.schema(
+            [(c, pa.float64()) if c in COLUMNAS_MONTOS else (c, pa.string()) for c in COLUMNAS]
+        )
+        self.writer = pq.ParquetWriter(salida, self.schema)
+        self.pendientes = []
+
+    def escribir(self, fila):
+        self.pendientes.append(fila)
+        if len(self.pendientes) >= TAMANO_GRUPO_PARQUET:
+            self._volcar()
+
+    def _volcar(self):
+        if self.pendientes:
+            self.writer.write_table(self.pa.Table.from_pylist(self.pendientes, schema=self.schema))
+            self.pendientes = []
+
+    def cerrar(self):
+        self._volcar()
+        self.writer.close()
+
+
+def procesar_lote(entrada, salida, procesos=None, modo=MODO_EXTRACCION):
+    """Procesa todos los recibos de `entrada` y devuelve (procesados, con error, segundos)."""
+    tareas = listar_recibos(entrada)
+    escritor = EscritorParquet(salida) if salida.lower().endswith(".parquet") else EscritorCSV(salida)
+    procesos = procesos or procesos_disponibles()
+
+    inicio = time.perf_counter()
+    errores = 0
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            filas = pool.map(partial(procesar_recibo, modo=modo), tareas, chunksize=TAMANO_TAREA)
+            for i, fila in enumerate(filas, 1):
+                escritor.escribir(fila)
+                if fila["error"]:
+                    errores += 1
+                    print(f"⚠️ {fila['archivo']}: {fila['error']}", file=sys.stderr)
+                if i % 500 == 0:
+                    print(f"{i}/{len(tareas)} recibos ({i / (time.perf_counter() - inicio):.1f}/s)", file=sys.stderr)
+    finally:
+        escritor.cerrar()
+    return len(tareas), errores, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procesa un lote de recibos de sueldo en PDF.")
+    parser.add_argument("entrada", help="Directorio o archivo .zip con los recibos en PDF")
+    parser.add_argument("-o", "--salida", default="recibos.csv", help="Archivo .csv o .parquet de salida")
+    parser.add_argument("-p", "--procesos", type=int, default=None,
+                        help="Cantidad de procesos (por defecto, uno por núcleo disponible)")
+    parser.add_argument("--modo", choices=MODOS_EXTRACCION, default=MODO_EXTRACCION,
+                        help="Modo de extracción de la tabla de conceptos")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.entrada):
+        parser.error(f"No existe la entrada {args.entrada}")
+
+    total, errores, segundos = procesar_lote(args.entrada, args.salida, args.procesos, args.modo)
+    velocidad = total / segundos if segundos else 0.0
+    print(f"✅ {total} recibos en {segundos:.1f} s ({velocidad:.1f} recibos/s), "
+          f"{errores} con error -> {args.salida}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
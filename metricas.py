@@ -0,0 +1,231 @@
+"""
+Tiempos por etapa del simulador (lectura de recibos, simulación, plantilla,
+sustitución, cuadro y guardado de la nota, descarga) y su exportación en el
+formato de texto de Prometheus.
+
+Se activa con variables de entorno; sin ellas, etapa() devuelve siempre el
+mismo contexto vacío y no se mide nada:
+- SIMULADOR_METRICAS=carpeta: cada etapa se suma a un histograma por nombre
+  y se anota con la sesión y el número de recarga de la app. En la carpeta
+  se escriben metricas.prom (los histogramas, para el textfile collector de
+  node_exporter) y tramos.jsonl (una línea por etapa medida), cada
+  INTERVALO_EXPORTACION segundos y al terminar el proceso.
+- SIMULADOR_PERFIL=archivo.prof: cProfile perfila las etapas de nivel
+  superior y guarda las estadísticas acumuladas en ese archivo (pstats,
+  snakeviz).
+
+Solo mide y exporta el proceso principal: en los procesos de un pool
+(varios recibos en paralelo, lote de notas, servicio HTTP) etapa() no hace
+nada; la app mide igual el total de la lectura.
+
+Uso:
+    SIMULADOR_METRICAS=metricas SIMULADOR_PERFIL=simulador.prof streamlit run app.py
+    python metricas.py metricas --sesion 5f0c...
+"""
+
+import argparse
+import atexit
+import bisect
+import contextlib
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+CARPETA_METRICAS = os.environ.get("SIMULADOR_METRICAS")
+RUTA_PERFIL = os.environ.get("SIMULADOR_PERFIL")
+ACTIVAS = bool(CARPETA_METRICAS or RUTA_PERFIL)
+
+ARCHIVO_PROMETHEUS = "metricas.prom"
+ARCHIVO_TRAMOS = "tramos.jsonl"
+INTERVALO_EXPORTACION = 10.0  # segundos
+# Espera máxima por el perfilador al exportar (otro hilo puede estar en una etapa)
+ESPERA_PERFIL = 1.0  # segundos
+
+# Límites superiores (segundos) de los intervalos de los histogramas
+LIMITES_HISTOGRAMA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULO = contextlib.nullcontext()
+_lock = threading.Lock()
+_local = threading.local()
+# Etapa -> [cantidad por intervalo (el último es +Inf), suma de segundos]
+_histogramas = {}
+_tramos = []
+_recargas = 0
+_contexto = None
+_ultima_exportacion = time.monotonic()
+
+# Un solo perfilador por proceso; perfila una etapa a la vez (cProfile no admite varios hilos)
+_perfil = None
+_perfil_lock = threading.Lock()
+
+
+def definir_contexto(funcion):
+    """`funcion()` devuelve (sesión, recarga) de la etapa en curso; la app la define una vez."""
+    global _contexto
+    _contexto = funcion
+
+
+def contar_recarga():
+    global _recargas
+    with _lock:
+        _recargas += 1
+
+
+def etapa(nombre):
+    """Contexto que mide la etapa `nombre`; sin métricas activas no hace nada."""
+    # Un proceso hijo no exporta: sus tramos se acumularían sin vaciarse nunca
+    if not ACTIVAS or multiprocessing.parent_process() is not None:
+        return _NULO
+    return _Tramo(nombre)
+
+
+class _Tramo:
+    __slots__ = ("nombre", "inicio", "perfilando")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.perfilando = False
+
+    def __enter__(self):
+        global _perfil
+        profundidad = getattr(_local, "profundidad", 0)
+        _local.profundidad = profundidad + 1
+        if RUTA_PERFIL and profundidad == 0 and _perfil_lock.acquire(blocking=False):
+            if _perfil is None:
+                import cProfile
+                _perfil = cProfile.Profile()
+            _perfil.enable()
+            self.perfilando = True
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        segundos = time.perf_counter() - self.inicio
+        if self.perfilando:
+            _perfil.disable()
+            _perfil_lock.release()
+        _local.profundidad -= 1
+        registrar(self.nombre, segundos)
+
+
+def registrar(nombre, segundos):
+    """Suma una medición al histograma de la etapa y exporta si pasó el intervalo."""
+    global _ultima_exportacion
+    sesion, recarga = _contexto() if _contexto else (None, None)
+    with _lock:
+        histograma = _histogramas.get(nombre)
+        if histograma is None:
+            histograma = _histogramas[nombre] = [[0] * (len(LIMITES_HISTOGRAMA) + 1), 0.0]
+        histograma[0][bisect.bisect_left(LIMITES_HISTOGRAMA, segundos)] += 1
+        histograma[1] += segundos
+        if CARPETA_METRICAS:
+            _tramos.append({"momento": datetime.now().isoformat(timespec="milliseconds"), "sesion": sesion,
+                            "recarga": recarga, "etapa": nombre, "segundos": round(segundos, 6)})
+        # Solo al cerrar una etapa de nivel superior: dentro de otra, este hilo
+        # puede tener tomado el perfilador, que exportar() necesita
+        exportar_ahora = (getattr(_local, "profundidad", 0) == 0
+                          and time.monotonic() - _ultima_exportacion >= INTERVALO_EXPORTACION)
+        if exportar_ahora:
+            _ultima_exportacion = time.monotonic()
+    if exportar_ahora:
+        exportar()
+
+
+def texto_prometheus():
+    """Los histogramas y la cantidad de recargas en el formato de texto de Prometheus."""
+    with _lock:
+        histogramas = {nombre: (list(conteos), suma) for nombre, (conteos, suma) in _histogramas.items()}
+        recargas = _recargas
+    lineas = [
+        "# HELP simulador_etapa_segundos Duración de cada etapa del simulador.",
+        "# TYPE simulador_etapa_segundos histogram",
+    ]
+    for nombre, (conteos, suma) in sorted(histogramas.items()):
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES_HISTOGRAMA + ("+Inf",), conteos):
+            acumulado += cantidad
+            lineas.append(f'simulador_etapa_segundos_bucket{{etapa="{nombre}",le="{limite}"}} {acumulado}')
+        lineas.append(f'simulador_etapa_segundos_sum{{etapa="{nombre}"}} {suma!r}')
+        lineas.append(f'simulador_etapa_segundos_count{{etapa="{nombre}"}} {acumulado}')
+    lineas += [
+        "# HELP simulador_recargas_total Ejecuciones del script de la app.",
+        "# TYPE simulador_recargas_total counter",
+        f"simulador_recargas_total {recargas}",
+    ]
+    return "\n".join(lineas) + "\n"
+
+
+def exportar():
+    """Escribe metricas.prom, agrega los tramos nuevos a tramos.jsonl y guarda el perfil."""
+    if multiprocessing.parent_process() is not None:
+        return
+    if CARPETA_METRICAS:
+        with _lock:
+            tramos = _tramos[:]
+            del _tramos[:]
+        os.makedirs(CARPETA_METRICAS, exist_ok=True)
+        ruta = os.path.join(CARPETA_METRICAS, ARCHIVO_PROMETHEUS)
+        # Se reemplaza de una vez: el collector nunca lee un archivo a medio escribir
+        with open(ruta + ".tmp", "w", encoding="utf-8") as archivo:
+            archivo.write(texto_prometheus())
+        os.replace(ruta + ".tmp", ruta)
+        if tramos:
+            with open(os.path.join(CARPETA_METRICAS, ARCHIVO_TRAMOS), "a", encoding="utf-8") as archivo:
+                archivo.writelines(json.dumps(t, ensure_ascii=False) + "\n" for t in tramos)
+    # Si el perfilador sigue ocupado (una etapa larga, o exportar() llamado desde
+    # una etapa), el perfil se guarda en la próxima exportación
+    if RUTA_PERFIL and _perfil is not None and _perfil_lock.acquire(timeout=ESPERA_PERFIL):
+        try:
+            _perfil.dump_stats(RUTA_PERFIL)
+        finally:
+            _perfil_lock.release()
+
+
+if ACTIVAS:
+    atexit.register(exportar)
+
+
+def resumir(tramos):
+    """(etapa, cantidad, p50, p95, máximo) en segundos, de la etapa más lenta a la más rápida."""
+    por_etapa = {}
+    for tramo in tramos:
+        por_etapa.setdefault(tramo["etapa"], []).append(tramo["segundos"])
+    filas = []
+    for nombre, segundos in por_etapa.items():
+        p95 = statistics.quantiles(segundos, n=20, method="inclusive")[18] if len(segundos) > 1 else segundos[0]
+        filas.append((nombre, len(segundos), statistics.median(segundos), p95, max(segundos)))
+    return sorted(filas, key=lambda f: f[2], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume los tiempos por etapa registrados en tramos.jsonl.")
+    parser.add_argument("carpeta", help="Carpeta de SIMULADOR_METRICAS")
+    parser.add_argument("--sesion", default=None, help="Solo las etapas de esta sesión")
+    args = parser.parse_args(argv)
+
+    ruta = os.path.join(args.carpeta, ARCHIVO_TRAMOS)
+    if not os.path.exists(ruta):
+        parser.error(f"No existe el archivo {ruta}")
+    with open(ruta, encoding="utf-8") as archivo:
+        tramos = [json.loads(linea) for linea in archivo if linea.strip()]
+    if args.sesion:
+        tramos = [t for t in tramos if t["sesion"] == args.sesion]
+    if not tramos:
+        print("⚠️ No hay etapas registradas")
+        return 0
+
+    print(f"{'etapa':15s} {'cantidad':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'máx ms':>9s}")
+    for nombre, cantidad, p50, p95, maximo in resumir(tramos):
+        print(f"{nombre:15s} {cantidad:8d} {p50 * 1000:9.2f} {p95 * 1000:9.2f} {maximo * 1000:9.2f}")
+    sesiones = {t["sesion"] for t in tramos}
+    print(f"✅ {len(tramos)} etapas de {len(sesiones)} sesiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Generación de la nota de solicitud a partir de la plantilla .docx.
+
+La plantilla se busca y se lee una sola vez; junto con su contenido se
+guarda en qué párrafos y celdas hay marcadores "<...>". Cada nota parte de
+una copia en memoria de la plantilla y solo visita esas ubicaciones. Si
+cambia el archivo de la plantilla, o se agregan o quitan otros .docx de
+notas en la carpeta, se vuelve a leer.
+
+Los marcadores de cada párrafo se reemplazan en una sola pasada, aunque Word
+los haya partido en varios runs, sin perder el formato de cada run.
+
+python-docx, num2words y el cálculo del cuadro se importan al generar la
+primera nota, no al importar el módulo.
+"""
+
+import bisect
+import calendar
+import functools
+import io
+import itertools
+import os
+import re
+import threading
+import zipfile
+from datetime import datetime, timedelta
+
+from metricas import etapa
+
+MARCADOR_CUADRO = "<cuadro_amortizacion>"
+MIME_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class ErrorNota(Exception):
+    pass
+
+
+def formatear_fecha_larga(fecha):
+    meses = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+             'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+    return f"{fecha.day} de {meses[fecha.month - 1]} del {fecha.year}"
+
+
+def tercer_viernes(fecha_base):
+    year = fecha_base.year
+    month = fecha_base.month
+    count = 0
+    for day in range(1, 32):
+        try:
+            fecha = datetime(year, month, day)
+            if fecha.weekday() == 4:
+                count += 1
+                if count == 3:
+                    return fecha
+        except ValueError:
+            break
+    return fecha_base
+
+
+def ultimo_dia_habil_del_mes(fecha_base):
+    anio, mes = fecha_base.year, fecha_base.month
+    ultimo_dia = calendar.monthrange(anio, mes)[1]
+    venc = datetime(anio, mes, ultimo_dia)
+    while venc.weekday() >= 5:
+        venc -= timedelta(days=1)
+    return venc
+
+
+def tiene_marcador(texto):
+    return "<" in texto and ">" in texto
+
+
+def empaquetar_sin_compresion(ruta):
+    # Las imágenes de la plantilla ya vienen comprimidas; guardarlas sin
+    # comprimir evita descomprimirlas de nuevo en cada nota
+    contenido = io.BytesIO()
+    with zipfile.ZipFile(ruta) as origen, zipfile.ZipFile(contenido, "w", zipfile.ZIP_STORED) as destino:
+        for info in origen.infolist():
+            destino.writestr(info.filename, origen.read(info))
+    return contenido.getvalue()
+
+
+class PlantillaNota:
+    def __init__(self, ruta, firma):
+        self.ruta = ruta
+        self.firma = firma
+        self.contenido = empaquetar_sin_compresion(ruta)
+        documento = self.copiar()
+
+        # Ubicación de los marcadores: índices de párrafo del cuerpo y
+        # (tabla, fila, columna) de las celdas
+        self.parrafos = [i for i, p in enumerate(documento.paragraphs) if tiene_marcador(p.text)]
+        self.parrafo_cuadro = next(
+            (i for i in self.parrafos if MARCADOR_CUADRO in documento.paragraphs[i].text), None
+        )
+        self.celdas = []
+        vistas = set()
+        for t, tabla in enumerate(documento.tables):
+            for f, fila in enumerate(tabla.rows):
+                for c, celda in enumerate(fila.cells):
+                    # Las celdas combinadas aparecen repetidas en fila.cells
+                    if celda._tc in vistas:
+                        continue
+                    vistas.add(celda._tc)
+                    if tiene_marcador(celda.text):
+                        self.celdas.append((t, f, c))
+
+    def tiene_marcadores(self):
+        return bool(self.parrafos or self.celdas)
+
+    def copiar(self):
+        from docx import Document
+
+        # Documento nuevo e independiente, leído desde memoria
+        return Document(io.BytesIO(self.contenido))
+
+
+_plantilla = None
+_plantilla_lock = threading.Lock()
+
+
+def _candidatas(directorio):
+    # Archivos de la carpeta que pueden ser la plantilla, en el orden en que se prueban
+    return tuple(sorted(a for a in os.listdir(directorio) if a.endswith(".docx") and "nota" in a.lower()))
+
+
+def _firma(directorio, ruta=None):
+    # Cambia si se agregan o quitan plantillas posibles o si se modifica la plantilla. No
+    # depende de los demás archivos de la carpeta (auditoria.db y sus -wal y -shm cambian
+    # con cada evento registrado)
+    firma = (directorio, _candidatas(directorio))
+    if ruta is not None:
+        firma += (os.stat(ruta).st_mtime_ns,)
+    return firma
+
+
+def buscar_plantilla(directorio):
+    for archivo in _candidatas(directorio):
+        ruta = os.path.join(directorio, archivo)
+        plantilla = PlantillaNota(ruta, _firma(directorio, ruta))
+        if plantilla.tiene_marcadores():
+            return plantilla
+    return None
+
+
+def obtener_plantilla(directorio=None):
+    """Plantilla de la nota, leída del disco solo la primera vez o si cambió.
+
+    Lanza ErrorNota si no hay plantilla o no se puede leer (un .docx dañado,
+    una carpeta inexistente).
+    """
+    global _plantilla
+    directorio = directorio or os.getcwd()
+    with _plantilla_lock:
+        try:
+            vigente = _plantilla is not None and _firma(directorio, _plantilla.ruta) == _plantilla.firma
+        except OSError:
+            vigente = False
+        if not vigente:
+            try:
+                _plantilla = buscar_plantilla(directorio)
+            except Exception as e:
+                _plantilla = None
+                raise ErrorNota(f"No se pudo leer la plantilla de la nota: {e}") from e
+        if _plantilla is None:
+            raise ErrorNota("No se encontró una plantilla con '<>' en la carpeta.")
+        return _plantilla
+
+
+@functools.lru_cache(maxsize=8)
+def patron_marcadores(marcadores):
+    # Una sola expresión con todos los marcadores; los más largos primero
+    return re.compile("|".join(re.escape(m) for m in sorted(marcadores, key=len, reverse=True)))
+
+
+def sustituir_marcadores(parrafo, datos):
+    """Reemplaza en una pasada los marcadores de `datos` presentes en el párrafo.
+
+    El valor queda en el run donde empieza el marcador, con su formato; las
+    partes del marcador que estaban en runs siguientes se eliminan y el resto
+    del texto de cada run no se modifica.
+    """
+    runs = parrafo.runs
+    textos = [r.text for r in runs]
+    completo = "".join(textos)
+    coincidencias = list(patron_marcadores(tuple(datos)).finditer(completo))
+    if not coincidencias:
+        return
+
+    # Posición donde termina cada run dentro del texto completo
+    fines = list(itertools.accumulate(len(t) for t in textos))
+    nuevos = [[] for _ in runs]
+
+    def copiar(desde, hasta):
+        i = bisect.bisect_right(fines, desde)
+        while desde < hasta:
+            corte = min(hasta, fines[i])
+            nuevos[i].append(completo[desde:corte])
+            desde = corte
+            i += 1
+
+    posicion = 0
+    for m in coincidencias:
+        copiar(posicion, m.start())
+        nuevos[bisect.bisect_right(fines, m.start())].append(datos[m.group()])
+        posicion = m.end()
+    copiar(posicion, len(completo))
+
+    for run, texto, partes in zip(runs, textos, nuevos):
+        nuevo = "".join(partes)
+        if nuevo != texto:
+            run.text = nuevo
+
+
+def filas_cuadro_xml(cuadro, anchos):
+    """Elemento <w:tbl> con una fila <w:tr> por cuota, armado de una vez desde los valores."""
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
+    celdas = "".join(
+        f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{ancho}"/></w:tcPr><w:p><w:r><w:t>{{}}</w:t></w:r></w:p></w:tc>'
+        for ancho in anchos
+    )
+    fila = f"<w:tr>{celdas}</w:tr>"
+    # Mismo texto que se obtenía con iterrows(): todas las columnas como float
+    filas = "".join(fila.format(*valores) for valores in cuadro.to_numpy(dtype=float).tolist())
+    return parse_xml(f"<w:tbl {nsdecls('w')}>{filas}</w:tbl>")
+
+
+def insertar_cuadro(doc, parrafo, cuadro):
+    from docx.oxml.ns import qn
+
+    parrafo.text = parrafo.text.replace(MARCADOR_CUADRO, "")
+    table = doc.add_table(rows=1, cols=len(cuadro.columns))
+    try:
+        table.style = 'Table Grid'
+    except KeyError:
+        # La plantilla no define el estilo; la tabla queda con el estilo por defecto
+        pass
+    hdr_cells = table.rows[0].cells
+    for j, col in enumerate(cuadro.columns):
+        hdr_cells[j].text = str(col)
+    anchos = [col.get(qn("w:w")) for col in table._tbl.tblGrid.gridCol_lst]
+    table._tbl.extend(filas_cuadro_xml(cuadro, anchos))
+    parrafo._p.addnext(table._tbl)
+
+
+def generar_nota(monto, cuotas, tasa_final, cuota, fecha, nombre, area, sector, motivo, motivo_detallado, puesto, neto,
+                 cuadro=None, directorio=None):
+    """Devuelve la nota completa como BytesIO; lanza ErrorNota si no se puede generar.
+
+    `cuadro` es el cuadro de amortización ya calculado en la simulación; si no
+    se pasa, se calcula a partir de monto, cuotas y tasa. La plantilla se busca
+    en `directorio` (por defecto, el directorio actual).
+    """
+    from num2words import num2words
+
+    from amortizacion import generar_cuadro_amortizacion
+
+    with etapa("plantilla"):
+        plantilla = obtener_plantilla(directorio)
+
+    try:
+        fecha_directorio = tercer_viernes(fecha)
+        vencimiento = ultimo_dia_habil_del_mes(fecha)
+        texto_letras = num2words(monto, lang='es').replace("uno", "un").capitalize() + " pesos"
+        neto_menos_cuota = neto - cuota
+
+        datos = {
+            "<nombre>": nombre,
+            "<area>": area,
+            "<sector>": sector,
+            "<fecha>": formatear_fecha_larga(fecha),
+            "<fecha_directorio>": formatear_fecha_larga(fecha_directorio),
+            "<monto>": f"${monto:,.2f}",
+            "<cuotas>": str(cuotas),
+            "<motivo>": motivo,
+            "<motivo_detallado>": motivo_detallado,
+            "<monto_en_letras>": texto_letras,
+            "<tasa>": f"{tasa_final:.2f}%",
+            "<vencimiento>": formatear_fecha_larga(vencimiento),
+            "<puesto>": puesto,
+            "<neto_menos_cuota>": f"${neto_menos_cuota:,.2f}"
+        }
+
+        with etapa("copia_plantilla"):
+            doc = plantilla.copiar()
+            parrafos = doc.paragraphs
+            tablas = doc.tables
+
+        with etapa("sustitucion"):
+            # Reemplazar marcadores en párrafos
+            for i in plantilla.parrafos:
+                sustituir_marcadores(parrafos[i], datos)
+
+            # Reemplazar marcadores en tablas
+            for t, f, c in plantilla.celdas:
+                for p in tablas[t].rows[f].cells[c].paragraphs:
+                    sustituir_marcadores(p, datos)
+
+        # Agregar la tabla de amortización
+        if plantilla.parrafo_cuadro is not None:
+            with etapa("cuadro"):
+                if cuadro is None:
+                    cuadro = generar_cuadro_amortizacion(monto, cuotas, tasa_final)
+                insertar_cuadro(doc, parrafos[plantilla.parrafo_cuadro], cuadro)
+
+        # Guardar en memoria
+        docx_bytes = io.BytesIO()
+        with etapa("guardado"):
+            doc.save(docx_bytes)
+        docx_bytes.seek(0)
+        return docx_bytes
+
+    except Exception as e:
+        raise ErrorNota(f"Error al generar nota: {e}") from e
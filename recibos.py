@@ -0,0 +1,317 @@
+"""
+Lectura de recibos de sueldo en PDF para el Sistema de Adelantos Haberes.
+
+El PDF se abre una sola vez; el nombre, los montos y el desglose por código
+se obtienen de esa misma lectura. Hay dos modos de extracción:
+
+- "texto" (por defecto): aplana cada página con page.get_text() y deduce
+  cantidad y monto mirando las líneas siguientes a cada código.
+- "layout": usa las coordenadas de cada palabra, ubica el encabezado de la
+  tabla de conceptos y asigna cada monto a su columna por posición x. No
+  depende del orden de las columnas ni de la etiqueta "Totales", pero es
+  algo más lento y asigna más memoria; si el recibo no tiene un encabezado
+  de tabla reconocible se usa el modo texto.
+"""
+
+import bisect
+import hashlib
+import itertools
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from metricas import etapa
+from resources import CODIGOS_BRUTO, CODIGOS_DEDUCCIONES
+
+# Cantidad máxima de recibos parseados que se mantienen en memoria
+MAX_RECIBOS_EN_CACHE = 64
+
+MODOS_EXTRACCION = ("layout", "texto")
+# Armar la página de texto de MuPDF domina el tiempo en ambos modos; el modo
+# layout suma las tuplas de cada palabra, sin leer menos (ver benchmarks/paridad_modos.py)
+MODO_EXTRACCION = "texto"
+
+# Encabezados de la tabla de conceptos y la columna que representa cada uno
+COLUMNAS_CONCEPTOS = {
+    "Codigo": "codigo",
+    "Concepto": "concepto",
+    "Cantidad": "cantidad",
+    "Remunerativo": "remunerativo",
+    "Deducciones": "deduccion",
+}
+COLUMNAS_MONTO = ("cantidad", "remunerativo", "deduccion")
+
+# Diferencia vertical máxima (en puntos) entre palabras de una misma fila
+TOLERANCIA_FILA = 3
+
+
+# Patrones compilados una sola vez
+MONTO_REGEX = re.compile(r'^-?\d{1,3}(?:\.\d{3})*,\d{2}$')
+CANTIDAD_REGEX = re.compile(r'^\d{1,3}(?:\.\d{3})*,\d{2}$')
+MONTO_AISLADO_REGEX = re.compile(r'^\s*(\d{1,3}(?:\.\d{3})*,\d{2})\s*$')
+CODIGO_REGEX = re.compile(r'^(\d+) [A-Za-z]')
+LETRA_REGEX = re.compile(r'[A-Za-z]')
+
+
+def construir_indice_conceptos(codigos_bruto, codigos_deducciones):
+    # código -> "REM"/"DED", para resolver cada línea con una sola búsqueda
+    indice = {codigo: "REM" for codigo in codigos_bruto}
+    indice.update({codigo: "DED" for codigo in codigos_deducciones if codigo not in indice})
+    return indice
+
+
+CONCEPTOS_POR_CODIGO = construir_indice_conceptos(CODIGOS_BRUTO, CODIGOS_DEDUCCIONES)
+
+
+class ReciboParseado(NamedTuple):
+    bruto: Optional[float]
+    deducciones: Optional[float]
+    neto: Optional[float]
+    detectados: Optional[list]
+    nombre: Optional[str]
+    error: Optional[str] = None
+
+
+# MuPDF no admite documentos abiertos en paralelo desde varios hilos del mismo proceso.
+# pymupdf (fitz) se importa al leer el primer PDF y no al importar este módulo
+_fitz_lock = threading.Lock()
+
+
+def parsear_monto(s):
+    # "1.234.567,89" -> 1234567.89
+    return float(s.replace('.', '').replace(',', '.'))
+
+
+def leer_lineas(contenido):
+    import fitz
+    # El PDF se lee directamente desde los bytes subidos, sin copiarlo a disco
+    with _fitz_lock, fitz.open(stream=contenido, filetype="pdf") as doc:
+        text = "".join(page.get_text() for page in doc)
+    return text.splitlines()
+
+
+def leer_palabras(contenido):
+    import fitz
+    # Una lista de palabras (x0, y0, x1, y1, texto, bloque, línea, n) por página
+    with _fitz_lock, fitz.open(stream=contenido, filetype="pdf") as doc:
+        return [page.get_text("words", flags=fitz.TEXT_MEDIABOX_CLIP) for page in doc]
+
+
+def lineas_desde_palabras(palabras):
+    # Reconstruye las líneas de texto tal como las agrupa page.get_text()
+    lineas = {}
+    for w in palabras:
+        lineas.setdefault((w[5], w[6]), []).append(w[4])
+    return [" ".join(textos) for textos in lineas.values()]
+
+
+def extraer_nombre(lines):
+    # Extraer nombre (buscando después de "Apellido y Nombre:")
+    for i, line in enumerate(lines):
+        if "Apellido y Nombre:" in line:
+            # Buscar la siguiente línea que contenga una coma (formato "Apellido, Nombre")
+            j = i + 1
+            while j < len(lines):
+                next_line = lines[j].strip()
+                if "," in next_line and not any(field in next_line for field in ["Categoria:", "Cargo:", "Egreso:", "Codigo", "Concepto"]):
+                    # Convertir de "Apellido, Nombre" a "Nombre Apellido"
+                    apellido, nombre_persona = next_line.split(",", 1)
+                    return f"{nombre_persona.strip()} {apellido.strip()}"
+                j += 1
+            break
+    return None
+
+
+def extraer_sueldos(lines):
+    nombre = extraer_nombre(lines)
+
+    # Extraer montos
+    valores = [match.group(1) for line in lines if (match := MONTO_AISLADO_REGEX.match(line))]
+
+    if len(valores) < 2:
+        raise ValueError("No se encontraron suficientes montos claros para bruto/neto")
+
+    valores_f = [parsear_monto(v) for v in valores]
+    sueldo_neto = valores_f[-1]
+    candidatos = [v for v in valores_f[-6:] if v > 1_000_000]
+    if not candidatos:
+        raise ValueError("No se detectó un valor alto para el sueldo bruto.")
+    sueldo_bruto = max(candidatos)
+
+    return sueldo_bruto, sueldo_neto, nombre
+
+
+def calcular_bloques_forzado(lines, conceptos=None):
+    conceptos = conceptos or CONCEPTOS_POR_CODIGO
+    totales = {"REM": 0.0, "DED": 0.0}
+    detectados = []
+
+    lineas = [line.strip() for line in lines]
+    n = len(lineas)
+    # Buscar la sección de conceptos
+    inicio = lineas.index("Codigo") + 1 if "Codigo" in lineas else n
+
+    for i in range(inicio, n):
+        line = lineas[i]
+        # Solo considerar líneas que empiezan por un código, espacio y una letra (no número ni coma)
+        match = CODIGO_REGEX.match(line)
+        if not match:
+            continue
+        codigo = match.group(1)
+        tipo = conceptos.get(codigo)
+        if tipo is None:
+            continue
+        # Caso 1: cantidad y luego monto
+        if i + 2 < n and CANTIDAD_REGEX.match(lineas[i+1]) and MONTO_REGEX.match(lineas[i+2]):
+            valor = parsear_monto(lineas[i+2])
+        # Caso 2: monto directo
+        elif i + 1 < n and MONTO_REGEX.match(lineas[i+1]):
+            valor = parsear_monto(lineas[i+1])
+        else:
+            continue
+        totales[tipo] += valor
+        detectados.append((codigo, valor, tipo, line))
+
+    bruto, deducciones = totales["REM"], totales["DED"]
+    neto = bruto - deducciones
+    return round(bruto, 2), round(deducciones, 2), round(neto, 2), detectados
+
+
+def ubicar_encabezado(palabras):
+    # Centro x de cada columna y borde inferior del encabezado "Codigo ... Deducciones"
+    encontrados = [w for w in palabras if w[4] in COLUMNAS_CONCEPTOS]
+    codigo = next((w for w in encontrados if w[4] == "Codigo"), None)
+    if codigo is None:
+        return None
+    columnas = {COLUMNAS_CONCEPTOS[w[4]]: (w[0] + w[2]) / 2
+                for w in encontrados if abs(w[1] - codigo[1]) <= TOLERANCIA_FILA}
+    if not all(c in columnas for c in COLUMNAS_MONTO):
+        return None
+    return columnas, codigo[3]
+
+
+def agrupar_filas(palabras):
+    # Palabras cuyo centro vertical difiere en menos de TOLERANCIA_FILA, ordenadas por x
+    filas = []
+    ultimo = None
+    for centro, x0, w in sorted(((w[1] + w[3]) / 2, w[0], w) for w in palabras):
+        if ultimo is not None and centro - ultimo <= TOLERANCIA_FILA:
+            filas[-1].append((x0, w))
+        else:
+            filas.append([(x0, w)])
+        ultimo = centro
+    return [[w for _, w in sorted(fila)] for fila in filas]
+
+
+def calcular_bloques_layout(paginas, conceptos=None):
+    """Versión de calcular_bloques_forzado basada en coordenadas; None si no hay tabla."""
+    conceptos = conceptos or CONCEPTOS_POR_CODIGO
+    totales = {"REM": 0.0, "DED": 0.0}
+    detectados = []
+    columnas = None
+
+    for palabras in paginas:
+        encabezado = ubicar_encabezado(palabras)
+        if encabezado:
+            columnas, y_inicio = encabezado
+            # Cada monto va a la columna cuyo centro está más cerca
+            orden = sorted(COLUMNAS_MONTO, key=columnas.get)
+            limites = [(columnas[a] + columnas[b]) / 2 for a, b in zip(orden, orden[1:])]
+        elif columnas:
+            # Continuación de la tabla de la página anterior
+            y_inicio = 0
+        else:
+            continue
+
+        # Leer solo la región de la tabla, debajo del encabezado
+        region = [w for w in palabras if (w[1] + w[3]) / 2 > y_inicio]
+
+        for fila in agrupar_filas(region):
+            codigo = fila[0][4]
+            tipo = conceptos.get(codigo)
+            # Igual que en modo texto: código, espacio y una letra
+            if tipo is None or len(fila) < 2 or not LETRA_REGEX.match(fila[1][4]):
+                continue
+
+            montos = {}
+            textos = []
+            for w in fila:
+                if MONTO_REGEX.match(w[4]):
+                    montos[orden[bisect.bisect(limites, (w[0] + w[2]) / 2)]] = w[4]
+                else:
+                    textos.append(w[4])
+
+            propia, otra = ("remunerativo", "deduccion") if tipo == "REM" else ("deduccion", "remunerativo")
+            valor_str = montos.get(propia) or montos.get(otra)
+            if valor_str is None:
+                continue
+            valor = parsear_monto(valor_str)
+            totales[tipo] += valor
+            detectados.append((codigo, valor, tipo, " ".join(textos)))
+
+    if columnas is None:
+        return None
+    bruto, deducciones = totales["REM"], totales["DED"]
+    neto = bruto - deducciones
+    return round(bruto, 2), round(deducciones, 2), round(neto, 2), detectados
+
+
+def parsear_recibo(contenido, modo=MODO_EXTRACCION):
+    """Lee el PDF una sola vez y devuelve totales, conceptos detectados y nombre."""
+    if modo not in MODOS_EXTRACCION:
+        raise ValueError(f"Modo de extracción desconocido: {modo}")
+    with etapa("recibo"):
+        try:
+            if modo == "texto":
+                lines = leer_lineas(contenido)
+                bloques = calcular_bloques_forzado(lines)
+            else:
+                paginas = leer_palabras(contenido)
+                bloques = calcular_bloques_layout(paginas)
+                if bloques is None:
+                    # Sin encabezado reconocible: mismo criterio que el modo texto
+                    lines = [line for palabras in paginas for line in lineas_desde_palabras(palabras)]
+                    bloques = calcular_bloques_forzado(lines)
+                else:
+                    lines = lineas_desde_palabras(paginas[0])
+            bruto, deducciones, neto, detectados = bloques
+        except Exception as e:
+            return ReciboParseado(None, None, None, None, None, f"Error al procesar PDF: {e}")
+        return ReciboParseado(bruto, deducciones, neto, detectados, extraer_nombre(lines))
+
+
+def parsear_recibos(contenidos, modo=MODO_EXTRACCION, executor=None):
+    """parsear_recibo para varios PDF, en el mismo orden.
+
+    Con `executor` (un pool de procesos: MuPDF no lee en paralelo desde varios
+    hilos) los recibos se leen al mismo tiempo.
+    """
+    if executor is None or len(contenidos) < 2:
+        return [parsear_recibo(c, modo) for c in contenidos]
+    return list(executor.map(parsear_recibo, contenidos, itertools.repeat(modo)))
+
+
+# Cache LRU de recibos parseados, indexada por el SHA-256 del contenido subido
+_cache_recibos = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parsear_recibo_cacheado(contenido, modo=MODO_EXTRACCION):
+    """Igual que parsear_recibo, pero reutiliza el resultado si el mismo PDF ya fue leído."""
+    clave = (hashlib.sha256(contenido).hexdigest(), modo)
+    with _cache_lock:
+        if clave in _cache_recibos:
+            _cache_recibos.move_to_end(clave)
+            return _cache_recibos[clave]
+
+    resultado = parsear_recibo(contenido, modo)
+
+    # Los errores no se guardan para permitir reintentar con el mismo archivo
+    if resultado.error is None:
+        with _cache_lock:
+            _cache_recibos[clave] = resultado
+            _cache_recibos.move_to_end(clave)
+            while len(_cache_recibos) > MAX_RECIBOS_EN_CACHE:
+                _cache_recibos.popitem(last=False)
+    return resultado
@@ -35,4 +35,32 @@ MOTIVOS = [
 # Tope máximo para préstamos (en pesos)
 TOPE_MAXIMO_PRESTAMO = 5_000_000  # 5 millones de pesos
 
+# Cantidad máxima de cuotas de un adelanto
+CUOTAS_MAXIMAS = 18
 
+# El monto no puede superar este múltiplo del sueldo bruto
+MULTIPLO_SUELDO_BRUTO = 3
+
+# La cuota no puede superar esta proporción del sueldo neto
+PROPORCION_SUELDO_NETO = 0.3
+
+# Reglas de elegibilidad, en el orden en que se verifican (elegibilidad.py).
+# Cada una limita el monto del préstamo o su cuota mensual ("limita") a
+# "factor" veces el sueldo indicado en "base", o a "factor" pesos si "base"
+# es None. "etiqueta" nombra la regla en las tablas y "mensaje" es el error
+# cuando no se cumple.
+REGLAS_ELEGIBILIDAD = [
+    {"limita": "monto", "base": None, "factor": TOPE_MAXIMO_PRESTAMO,
+     "etiqueta": "Tope máximo",
+     "mensaje": f"El monto excede el tope máximo permitido de ${TOPE_MAXIMO_PRESTAMO:,.2f}."},
+    {"limita": "monto", "base": "bruto", "factor": MULTIPLO_SUELDO_BRUTO,
+     "etiqueta": f"{MULTIPLO_SUELDO_BRUTO} × sueldo bruto",
+     "mensaje": f"El monto excede {MULTIPLO_SUELDO_BRUTO} veces el sueldo bruto."},
+    {"limita": "cuota", "base": "neto", "factor": PROPORCION_SUELDO_NETO,
+     "etiqueta": f"Cuota ≤ {PROPORCION_SUELDO_NETO:.0%} del neto",
+     "mensaje": f"La cuota mensual excede el {PROPORCION_SUELDO_NETO:.0%} del sueldo neto."},
+]
+
+# Cómo se combinan los sueldos de varios recibos para aplicar las reglas
+# anteriores: "promedio", "minimo" o "mediana"
+CRITERIO_BASE_SUELDO = "promedio"